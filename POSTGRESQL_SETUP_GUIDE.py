@@ -908,15 +908,13 @@ Error:
     sqlalchemy.exc.TimeoutError: QueuePool limit of size 5 overflow 10 reached
 
 Solution:
-    Update database.py engine configuration:
+    Raise the pool limits in .env (defaults shown):
     
-    engine = create_engine(
-        Config.DATABASE_URL,
-        pool_size=10,
-        max_overflow=20,
-        pool_pre_ping=True,
-        pool_recycle=3600
-    )
+    DB_POOL_SIZE=10
+    DB_MAX_OVERFLOW=20
+    DB_POOL_TIMEOUT=30
+    DB_POOL_RECYCLE=3600
+    DB_POOL_PRE_PING=true
 
 
 ═══════════════════════════════════════════════════════════════════
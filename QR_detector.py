@@ -4,14 +4,28 @@ import sqlite3
 import requests
 import time
 import threading
-from queue import Queue
+import multiprocessing as mp
+from collections import OrderedDict
+from queue import Queue, Empty
 from datetime import datetime
 import os
+from scipy.optimize import linear_sum_assignment
+from qr_scanner import ChangeDetector
+from frame_ring import FrameRing
+from write_behind import WriteBehindBuffer
 
 # =================== DATABASE SETUP ===================
+LOG_DB_PATH = "data/warehouse_log.db"
+LOG_BATCH_SIZE = 500
+LOG_FLUSH_INTERVAL = 0.5
+LOG_QUEUE_SIZE = 50000
+
+
 def init_db():
     os.makedirs("data", exist_ok=True)
-    conn = sqlite3.connect("data/warehouse_log.db")
+    conn = sqlite3.connect(LOG_DB_PATH)
+    # WAL is persistent, so readers of the log never block the writer
+    conn.execute("PRAGMA journal_mode=WAL")
     cur = conn.cursor()
     cur.execute('''CREATE TABLE IF NOT EXISTS verification_log (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -25,27 +39,234 @@ def init_db():
     conn.close()
 
 
+class EventLogger:
+    """Write-behind verification log on a single SQLite connection.
+
+    log() only enqueues the row. The WriteBehindBuffer thread owns the
+    connection (WAL, synchronous=NORMAL) and commits a batch every batch_size
+    rows or flush_interval seconds, whichever comes first. Rows that arrive
+    while the queue is full are dropped and counted rather than stalling
+    detection.
+    """
+
+    # Locked or unreadable database: retry the batch rather than split it
+    transient_errors = (sqlite3.OperationalError,)
+
+    def __init__(self, path=LOG_DB_PATH, batch_size=LOG_BATCH_SIZE, flush_interval=LOG_FLUSH_INTERVAL,
+                 max_queue=LOG_QUEUE_SIZE):
+        self.path = path
+        self.conn = None
+        self.buffer = WriteBehindBuffer(self, "event-logger", batch_size, flush_interval, max_queue)
+
+    def log(self, product_id, expected_shelf, detected_shelf, status):
+        row = (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), product_id, expected_shelf, detected_shelf, status)
+        return self.buffer.put([row])
+
+    def connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL only syncs at checkpoints in WAL mode; a crash can lose the last batch, never corrupt the file
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn = conn
+
+    def disconnect(self):
+        self.conn.close()
+        self.conn = None
+
+    def write(self, rows):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO verification_log (timestamp, product_id, expected_shelf, detected_shelf, status) "
+                "VALUES (?, ?, ?, ?, ?)", rows)
+
+    def close(self, timeout=10):
+        """Flush everything queued so far and stop the writer thread"""
+        self.buffer.stop(timeout)
+
+    def stats(self):
+        return self.buffer.stats()
+
+
+event_logger = EventLogger()
+
+
 def log_event(product_id, expected_shelf, detected_shelf, status):
-    conn = sqlite3.connect("data/warehouse_log.db")
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO verification_log (timestamp, product_id, expected_shelf, detected_shelf, status) VALUES (?, ?, ?, ?, ?)",
-        (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), product_id, expected_shelf, detected_shelf, status))
-    conn.commit()
-    conn.close()
+    return event_logger.log(product_id, expected_shelf, detected_shelf, status)
 
 
 # =================== FRAME FETCHER ===================
-def get_frame_from_api(api_url: str):
-    try:
-        response = requests.get(api_url, timeout=3)
-        if response.status_code == 200:
-            img_array = np.asarray(bytearray(response.content), dtype=np.uint8)
-            frame = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-            return frame
-    except Exception:
-        pass
-    return None
+MJPEG_CHUNK_SIZE = 16384
+MJPEG_CONNECT_TIMEOUT = 3
+MJPEG_READ_TIMEOUT = 10
+MJPEG_RECONNECT_MAX = 10.0
+MJPEG_MAX_FRAME_SIZE = 4 * 1024 * 1024
+
+
+class MJPEGStreamReader:
+    """Decode frames from a multipart/x-mixed-replace (MJPEG) HTTP stream.
+
+    One connection stays open and parts are cut out of a single growing
+    bytearray as bytes arrive, using Content-Length when the camera sends
+    it and the next boundary otherwise. A URL that answers with a plain
+    image is polled, one request per frame. Dropped connections and
+    requests that yield no frame are retried with exponential backoff.
+    """
+
+    def __init__(self, url, chunk_size=MJPEG_CHUNK_SIZE, reconnect_max=MJPEG_RECONNECT_MAX,
+                 timeout=(MJPEG_CONNECT_TIMEOUT, MJPEG_READ_TIMEOUT), max_frame_size=MJPEG_MAX_FRAME_SIZE):
+        self.url = url
+        self.chunk_size = chunk_size
+        self.reconnect_max = reconnect_max
+        self.timeout = timeout
+        self.max_frame_size = max_frame_size
+        self.session = requests.Session()
+        self.response = None
+        self.closed = False
+
+        self.frames_read = 0
+        self.bytes_read = 0
+        self.decode_errors = 0
+        self.reconnects = 0
+
+    @staticmethod
+    def parse_boundary(content_type):
+        for param in content_type.split(";")[1:]:
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "boundary" and value:
+                value = value.strip('"')
+                # Some cameras already include the leading dashes in the parameter
+                return value.encode() if value.startswith("--") else b"--" + value.encode()
+        return None
+
+    def frames(self):
+        """Yield decoded BGR frames until close(); reconnects on errors"""
+        backoff = 0.5
+        while not self.closed:
+            frames_before = self.frames_read
+            single_image = False
+            try:
+                self.response = self.session.get(self.url, stream=True, timeout=self.timeout)
+                self.response.raise_for_status()
+                content_type = self.response.headers.get("Content-Type", "")
+                boundary = self.parse_boundary(content_type)
+                if boundary is None:
+                    # Snapshot endpoint: one frame per request, falls through to the backoff when it fails
+                    single_image = True
+                    frame = self._decode(self.response.content, 0, len(self.response.content))
+                    if frame is not None:
+                        yield frame
+                else:
+                    yield from self._read_parts(boundary)
+            except Exception as e:
+                if not self.closed:
+                    print(f"⚠️ MJPEG stream error: {e}")
+            finally:
+                if self.response is not None:
+                    self.response.close()
+
+            if self.closed:
+                break
+            if self.frames_read > frames_before:
+                backoff = 0.5
+                if single_image:
+                    # Polling the next snapshot is not a reconnect
+                    continue
+            else:
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.reconnect_max)
+            self.reconnects += 1
+
+    def _read_parts(self, boundary):
+        raw = self.response.raw
+        read = getattr(raw, "read1", None) or raw.read
+        buffer = bytearray()
+        scan_from = 0
+
+        while not self.closed:
+            chunk = read(self.chunk_size)
+            if not chunk:
+                return
+            buffer += chunk
+            self.bytes_read += len(chunk)
+
+            while True:
+                start = buffer.find(boundary, scan_from)
+                if start < 0:
+                    # Keep only a possible partial boundary at the tail
+                    keep = len(boundary) - 1
+                    if len(buffer) > keep:
+                        del buffer[:len(buffer) - keep]
+                    scan_from = 0
+                    break
+
+                header_end = buffer.find(b"\r\n\r\n", start)
+                if header_end < 0:
+                    scan_from = start
+                    break
+                body_start = header_end + 4
+                length = self._content_length(buffer[start:header_end])
+
+                if length is not None:
+                    if length > self.max_frame_size:
+                        raise ValueError(f"MJPEG part of {length} bytes exceeds max_frame_size")
+                    body_end = next_part = body_start + length
+                    if body_end > len(buffer):
+                        scan_from = start
+                        break
+                else:
+                    next_part = buffer.find(boundary, body_start)
+                    if next_part < 0:
+                        if len(buffer) - body_start > self.max_frame_size:
+                            raise ValueError("MJPEG part exceeds max_frame_size without a boundary")
+                        scan_from = start
+                        break
+                    body_end = next_part
+                    while body_end > body_start and buffer[body_end - 1] in b"\r\n":
+                        body_end -= 1
+
+                frame = self._decode(buffer, body_start, body_end)
+                del buffer[:next_part]
+                scan_from = 0
+                if frame is not None:
+                    yield frame
+
+    @staticmethod
+    def _content_length(headers):
+        for line in bytes(headers).split(b"\r\n"):
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                try:
+                    return int(value.strip())
+                except ValueError:
+                    return None
+        return None
+
+    def _decode(self, data, start, end):
+        if end <= start:
+            return None
+        encoded = np.frombuffer(data, dtype=np.uint8, count=end - start, offset=start)
+        frame = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+        # Drop the view so the bytearray can be resized again
+        del encoded
+        if frame is None:
+            self.decode_errors += 1
+            return None
+        self.frames_read += 1
+        return frame
+
+    def close(self):
+        self.closed = True
+        if self.response is not None:
+            self.response.close()
+        self.session.close()
+
+    def stats(self):
+        return {
+            'frames': self.frames_read,
+            'bytes': self.bytes_read,
+            'decode_errors': self.decode_errors,
+            'reconnects': self.reconnects
+        }
 
 
 # =================== QR DETECTOR (WECHAT MODEL) ===================
@@ -79,8 +300,191 @@ def detect_qr_codes(frame, wechat_detector):
     return detections
 
 
+# =================== DETECTOR PROCESS POOL ===================
+FRAME_SHAPE = (480, 640, 3)
+DETECTOR_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+# A frame outstanding this long is assumed lost with its worker
+DETECTOR_TASK_TIMEOUT = 10.0
+
+
+def detector_process(ring_name, slots, frame_shape, tasks, results, detector_factory):
+    shm, frames = FrameRing.attach(ring_name, slots, frame_shape)
+    try:
+        try:
+            wechat_detector = detector_factory()
+        except Exception as e:
+            # Report instead of dying silently; the parent prints it and stops counting on us
+            results.put((None, None, None, f"{type(e).__name__}: {e}"))
+            return
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            seq, slot, timestamp = task
+            try:
+                detections = detect_qr_codes(frames[slot], wechat_detector)
+            except Exception as e:
+                print(f"❌ Detector process error: {e}")
+                detections = []
+            results.put((seq, slot, timestamp, detections))
+    finally:
+        del frames
+        shm.close()
+
+
+class DetectorPool:
+    """Runs detect_qr_codes in worker processes, each with its own WeChat detector.
+
+    Frames live in a shared-memory FrameRing; only (seq, slot) goes through
+    the task queue. Results are handed to on_result in frame order; a frame
+    whose worker died or that takes longer than task_timeout is skipped.
+    """
+
+    def __init__(self, on_result, workers=DETECTOR_WORKERS, frame_shape=FRAME_SHAPE,
+                 slots=None, detector_factory=None, task_timeout=DETECTOR_TASK_TIMEOUT):
+        factory = detector_factory or load_wechat_detector
+        # Missing model files should fail here, not in every child after the pool is up
+        factory()
+
+        self.on_result = on_result
+        self.task_timeout = task_timeout
+        self.ring = FrameRing(slots or workers * 2 + 1, frame_shape, shared=True)
+        self.seq_lock = threading.Lock()
+
+        self.tasks = mp.Queue()
+        self.results = mp.Queue()
+        self.next_seq = 0
+        self.emit_seq = 0
+        self.reorder = {}
+        self.in_flight = {}
+        self.submitted = 0
+        self.lost = 0
+        self.errors = 0
+
+        self.processes = [
+            mp.Process(target=detector_process,
+                       args=(self.ring.name, self.ring.slots, frame_shape, self.tasks, self.results, factory),
+                       daemon=True)
+            for _ in range(workers)
+        ]
+        for process in self.processes:
+            process.start()
+
+        self.collector = threading.Thread(target=self._collect, daemon=True)
+        self.collector.start()
+
+    def submit_slot(self, slot, timestamp):
+        """Hand an acquired ring slot to the workers; the pool releases it when done"""
+        with self.seq_lock:
+            seq = self.next_seq
+            self.next_seq += 1
+            self.in_flight[seq] = (slot, time.time())
+        self.tasks.put((seq, slot, timestamp))
+        self.submitted += 1
+
+    def submit(self, frame, timestamp):
+        """Copy a frame into the ring and queue it; returns False on ring overrun"""
+        slot = self.ring.write(frame)
+        if slot is None:
+            return False
+        self.submit_slot(slot, timestamp)
+        return True
+
+    def is_alive(self):
+        return any(process.is_alive() for process in self.processes)
+
+    def _collect(self):
+        while True:
+            try:
+                item = self.results.get(timeout=1.0)
+            except Empty:
+                item = ()
+            if item is None:
+                break
+            if item:
+                seq, slot, timestamp, detections = item
+                if seq is None:
+                    print(f"❌ Detector process failed to start: {detections}")
+                    self.errors += 1
+                else:
+                    with self.seq_lock:
+                        pending = self.in_flight.pop(seq, None)
+                    # None means the frame was already skipped and its slot released
+                    if pending is not None:
+                        self.ring.release(slot)
+                        self.reorder[seq] = (timestamp, detections)
+            self._emit()
+
+    def _emit(self):
+        """Hand on results in frame order, skipping frames that will never come back"""
+        while True:
+            if self.emit_seq in self.reorder:
+                timestamp, detections = self.reorder.pop(self.emit_seq)
+                self.emit_seq += 1
+                self.on_result(detections, timestamp)
+                continue
+            with self.seq_lock:
+                pending = self.in_flight.get(self.emit_seq)
+                if pending is None or (self.is_alive() and time.time() - pending[1] < self.task_timeout):
+                    return
+                del self.in_flight[self.emit_seq]
+            self.ring.release(pending[0])
+            self.lost += 1
+            self.emit_seq += 1
+
+    def close(self, timeout=5):
+        for _ in self.processes:
+            self.tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=timeout)
+            if process.is_alive():
+                process.terminate()
+        self.results.put(None)
+        self.collector.join(timeout=timeout)
+        self.ring.close()
+
+
 # =================== SPATIAL MATCHING ===================
-def verify_product_placement(qr_detections):
+MAX_SHELF_DX = 150
+NO_MATCH_DISTANCE = 9999
+ONE_TO_ONE_MATCHING = False
+
+
+def match_products_to_shelves(product_centers, shelf_centers, one_to_one=False):
+    """Index of the matched shelf for each product, or -1.
+
+    A shelf qualifies when it is below the product (dy > 0) and within
+    MAX_SHELF_DX horizontally; the nearest qualifying shelf wins, the first
+    one on ties. With one_to_one each shelf takes at most one product and
+    the total distance is minimised (Hungarian assignment).
+    """
+    products = np.asarray(product_centers, dtype=np.float64).reshape(-1, 2)
+    shelves = np.asarray(shelf_centers, dtype=np.float64).reshape(-1, 2)
+    matches = np.full(len(products), -1, dtype=np.intp)
+    if not len(products) or not len(shelves):
+        return matches
+
+    dx = np.abs(products[:, 0, None] - shelves[None, :, 0])
+    dy = shelves[None, :, 1] - products[:, 1, None]
+    dist = np.sqrt(dx ** 2 + dy ** 2)
+    valid = (dy > 0) & (dx < MAX_SHELF_DX) & (dist < NO_MATCH_DISTANCE)
+
+    if one_to_one:
+        rows = np.flatnonzero(valid.any(axis=1))
+        if len(rows):
+            cost = np.where(valid[rows], dist[rows], NO_MATCH_DISTANCE * len(rows))
+            assigned_rows, assigned_cols = linear_sum_assignment(cost)
+            keep = valid[rows[assigned_rows], assigned_cols]
+            matches[rows[assigned_rows[keep]]] = assigned_cols[keep]
+        return matches
+
+    nearest = np.where(valid, dist, np.inf).argmin(axis=1)
+    has_match = valid.any(axis=1)
+    matches[has_match] = nearest[has_match]
+    return matches
+
+
+def verify_product_placement(qr_detections, one_to_one=ONE_TO_ONE_MATCHING):
     products, shelves = [], []
 
     for item in qr_detections:
@@ -93,17 +497,11 @@ def verify_product_placement(qr_detections):
             else:
                 shelves.append((shelf_id, item["center"]))
 
-    results = []
-    for pid, expected_sid, p_center in products:
-        matched_shelf, min_distance = None, 9999
-        for sid, s_center in shelves:
-            dx = abs(p_center[0] - s_center[0])
-            dy = s_center[1] - p_center[1]
-            if dy > 0 and dx < 150:
-                dist = np.sqrt(dx**2 + dy**2)
-                if dist < min_distance:
-                    min_distance, matched_shelf = dist, sid
+    matches = match_products_to_shelves([p[2] for p in products], [s[1] for s in shelves], one_to_one)
 
+    results = []
+    for (pid, expected_sid, _), shelf_index in zip(products, matches):
+        matched_shelf = shelves[shelf_index][0] if shelf_index >= 0 else None
         status = "✅ Correct" if matched_shelf == expected_sid else (
             "❌ Misplaced" if matched_shelf else "⚠️ No shelf detected")
         log_event(pid, expected_sid, matched_shelf or "-", status)
@@ -113,62 +511,159 @@ def verify_product_placement(qr_detections):
 
 
 # =================== QR PROCESSING THREAD ===================
-def qr_worker(q, wechat_detector, mode, cooldowns):
+COOLDOWN_SECONDS = 3
+COOLDOWN_MAX_SIZE = 10000
+COOLDOWN_BUCKET_SECONDS = 1.0
+
+
+class CooldownMap:
+    """Thread-safe "seen recently" map for QR strings, bounded in time and size.
+
+    Keys are grouped into buckets of bucket_seconds by their last accepted
+    time, oldest bucket first. Expiry pops whole buckets once every key in
+    them is past the ttl, so each key is removed once (O(1) amortized).
+    Past max_size the oldest keys are evicted early.
+    """
+
+    def __init__(self, ttl=COOLDOWN_SECONDS, max_size=COOLDOWN_MAX_SIZE, bucket_seconds=COOLDOWN_BUCKET_SECONDS):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.bucket_seconds = bucket_seconds
+        self.lock = threading.Lock()
+        self.last_seen = {}
+        self.buckets = OrderedDict()
+        self.expired = 0
+        self.evictions = 0
+
+    def __len__(self):
+        with self.lock:
+            return len(self.last_seen)
+
+    def _expire(self, now):
+        horizon = int((now - self.ttl) // self.bucket_seconds)
+        while self.buckets:
+            bucket, keys = next(iter(self.buckets.items()))
+            if bucket >= horizon:
+                break
+            self.buckets.popitem(last=False)
+            for key in keys:
+                del self.last_seen[key]
+            self.expired += len(keys)
+
+    def _evict_oldest(self):
+        bucket, keys = next(iter(self.buckets.items()))
+        # A bucket can be left empty when its keys were re-accepted into a newer one
+        if keys:
+            del self.last_seen[keys.pop()]
+            self.evictions += 1
+        if not keys:
+            del self.buckets[bucket]
+
+    def allow(self, key, now=None):
+        """True (and start the cooldown) unless key was accepted within the last ttl seconds"""
+        now = time.time() if now is None else now
+        with self.lock:
+            self._expire(now)
+            entry = self.last_seen.get(key)
+            if entry is not None and now - entry[0] <= self.ttl:
+                return False
+            if entry is not None:
+                self.buckets[entry[1]].discard(key)
+
+            # Never file a key behind the newest bucket so the buckets stay in time order
+            bucket = int(now // self.bucket_seconds)
+            if self.buckets:
+                bucket = max(bucket, next(reversed(self.buckets)))
+            self.buckets.setdefault(bucket, set()).add(key)
+            self.last_seen[key] = (now, bucket)
+
+            while len(self.last_seen) > self.max_size:
+                self._evict_oldest()
+            return True
+
+    def stats(self):
+        with self.lock:
+            return {
+                'size': len(self.last_seen),
+                'buckets': len(self.buckets),
+                'expired': self.expired,
+                'evictions': self.evictions
+            }
+
+
+def handle_detections(detections, now, mode, cooldowns):
+    if not detections:
+        return
+
+    new_detections = [d for d in detections if cooldowns.allow(d["data"], now)]
+
+    if mode == "update":
+        for d in new_detections:
+            qr_data = d["data"]
+            parts = qr_data.split("/")
+            product_id = parts[0] if len(parts) > 0 else "unknown"
+            expected_shelf = parts[1] if len(parts) > 1 else "-"
+            detected_shelf = parts[2] if len(parts) > 2 else "-"
+            log_event(product_id, expected_shelf, detected_shelf, "Database Update")
+            print(f"🆕 Logged new entry: {qr_data}")
+    else:
+        results = verify_product_placement(new_detections)
+        for (pid, expected, detected, status) in results:
+            print(f"Product {pid}: Expected Shelf {expected}, Detected {detected}, Status: {status}")
+
+
+def qr_worker(q, ring, wechat_detector, mode, cooldowns):
     while True:
         item = q.get()
         if item is None:
+            q.task_done()
             break
 
-        frame, now = item
-        detections = detect_qr_codes(frame, wechat_detector)
-        if not detections:
+        slot, now = item
+        try:
+            handle_detections(detect_qr_codes(ring.view(slot), wechat_detector), now, mode, cooldowns)
+        finally:
+            ring.release(slot)
             q.task_done()
-            continue
-
-        new_detections = []
-        for d in detections:
-            data = d["data"]
-            if data not in cooldowns or now - cooldowns[data] > 3:
-                cooldowns[data] = now
-                new_detections.append(d)
-
-        if mode == "update":
-            for d in new_detections:
-                qr_data = d["data"]
-                parts = qr_data.split("/")
-                product_id = parts[0] if len(parts) > 0 else "unknown"
-                expected_shelf = parts[1] if len(parts) > 1 else "-"
-                detected_shelf = parts[2] if len(parts) > 2 else "-"
-                log_event(product_id, expected_shelf, detected_shelf, "Database Update")
-                print(f"🆕 Logged new entry: {qr_data}")
-        else:
-            results = verify_product_placement(new_detections)
-            for (pid, expected, detected, status) in results:
-                print(f"Product {pid}: Expected Shelf {expected}, Detected {detected}, Status: {status}")
-
-        q.task_done()
 
 
 # =================== MAIN LOOP ===================
-def warehouse_verifier(api_url=None, use_camera=False, mode="verify"):
+def warehouse_verifier(api_url=None, use_camera=False, mode="verify", change_threshold=3.0, change_refresh=2.0,
+                       detector_workers=DETECTOR_WORKERS):
     print(f"🚀 Warehouse QR Verifier started in [{mode.upper()}] mode — press 'q' to quit.")
     init_db()
 
     #cap = cv2.VideoCapture(0) if use_camera else None
     cap = cv2.VideoCapture("http://10.23.114.109:81/stream")
 
-    wechat_detector = load_wechat_detector()
+    stream = None
+    if not use_camera:
+        stream = MJPEGStreamReader(api_url)
+        stream_frames = stream.frames()
 
     cv2.namedWindow("Warehouse QR Verifier", cv2.WINDOW_NORMAL)
     cv2.resizeWindow("Warehouse QR Verifier", 900, 600)
 
-    frame_queue = Queue(maxsize=2)
-    cooldowns = {}
-    worker = threading.Thread(target=qr_worker, args=(frame_queue, wechat_detector, mode, cooldowns), daemon=True)
-    worker.start()
+    cooldowns = CooldownMap()
+    pool, frame_queue = None, None
+    if detector_workers:
+        # Each process loads its own WeChat detector; 0 keeps detection on a thread in this process
+        pool = DetectorPool(lambda detections, now: handle_detections(detections, now, mode, cooldowns),
+                            workers=detector_workers)
+        ring = pool.ring
+        print(f"🧵 Detector pool: {detector_workers} process(es)")
+    else:
+        wechat_detector = load_wechat_detector()
+        # Display slot + two queued + one being detected
+        ring = FrameRing(4, FRAME_SHAPE)
+        frame_queue = Queue(maxsize=2)
+        worker = threading.Thread(target=qr_worker, args=(frame_queue, ring, wechat_detector, mode, cooldowns),
+                                  daemon=True)
+        worker.start()
 
     frame_count, start_time = 0, time.time()
     SKIP_FRAMES = 2
+    change_detector = ChangeDetector(threshold=change_threshold, refresh_interval=change_refresh)
 
     while True:
         frame = None
@@ -178,27 +673,52 @@ def warehouse_verifier(api_url=None, use_camera=False, mode="verify"):
                 print("Camera error.")
                 break
         else:
-            frame = get_frame_from_api(api_url)
+            frame = next(stream_frames, None)
             if frame is None:
-                continue
+                break
 
-        frame = cv2.resize(frame, (640, 480))
+        # Resize straight into a ring slot; the detector gets the slot index, not a copy
+        slot = ring.acquire()
+        if slot is None:
+            frame = cv2.resize(frame, (640, 480))
+        else:
+            frame = cv2.resize(frame, (640, 480), dst=ring.view(slot))
         frame_count += 1
 
-        if frame_count % SKIP_FRAMES == 0 and not frame_queue.full():
-            frame_queue.put((frame.copy(), time.time()))
+        submitted = False
+        if (slot is not None and frame_count % SKIP_FRAMES == 0
+                and (pool is not None or not frame_queue.full())
+                and change_detector.should_process(frame)):
+            if pool is not None:
+                pool.submit_slot(slot, time.time())
+            else:
+                frame_queue.put((slot, time.time()))
+            submitted = True
 
         cv2.imshow("Warehouse QR Verifier", frame)
+        if slot is not None and not submitted:
+            ring.release(slot)
 
         if frame_count % 30 == 0:
+            if pool is not None and not pool.is_alive():
+                print("❌ All detector processes have exited.")
+                break
             fps = frame_count / (time.time() - start_time)
-            print(f"⚙️ FPS: {fps:.1f}")
+            print(f"⚙️ FPS: {fps:.1f} | Static frames skipped: {change_detector.skipped} | "
+                  f"Ring overruns: {ring.overruns} | Cooldowns: {len(cooldowns)} "
+                  f"({cooldowns.evictions} evicted)")
 
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
-    frame_queue.put(None)
-    frame_queue.join()
+    if pool is not None:
+        pool.close()
+    else:
+        frame_queue.put(None)
+        frame_queue.join()
+    event_logger.close()
+    if stream is not None:
+        stream.close()
     if cap:
         cap.release()
     cv2.destroyAllWindows()
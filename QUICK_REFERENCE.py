@@ -31,6 +31,12 @@ seed_data.py      - Database dummy data
 setup_database.py - Initialize DB
 generate_qr.py    - Create QR code images
 test_api.py       - API testing
+benchmark_scanner.py - QR detection strategy benchmark (qr_codes/ at simulated distances)
+benchmark_matching.py - Product-to-shelf matching benchmark (hundreds of codes per frame)
+benchmark_db.py   - Per-request database overhead (SQL echo vs tuned engine)
+migrate.py        - Apply schema migrations (python migrate.py [status])
+explain_queries.py - EXPLAIN plans for hot queries on a seeded 10M-row scan log
+partitions.py     - scan_logs partitions + retention rollup (python partitions.py [status])
 install.py        - Auto installer
 manage.py         - Management console
 
@@ -45,9 +51,19 @@ API ENDPOINTS:
 ━━━━━━━━━━━━━━
 GET  /                    → Dashboard
 GET  /video_feed          → Live video
-GET  /products            → All products
-GET  /scan_history        → Scan logs
+GET  /video_feed/<robot>  → Live video from one robot
+POST /upload_frame/<robot> → Upload a frame for one robot
+POST /upload_stream[/<robot>] → Persistent length-prefixed JPEG upload
+GET  /streams             → Per-robot stream counters
+GET  /products            → Active products (?fields=, ?limit=&offset=, ETag)
+GET  /scan_history        → Scan logs (?limit=≤200, ?cursor= from X-Next-Cursor)
 POST /verify_qr           → Verify QR code
+POST /verify_qr/batch     → Verify a list of QR codes
+POST /scan_event          → Log a scan the robot answered from its cache
+GET  /catalog/version     → Catalog content hash (?since=TAG&timeout=S long-polls)
+GET  /catalog/stats       → Catalog cache hit/miss counters
+POST /catalog/invalidate  → Reload catalog cache
+GET  /scan_writer/stats   → Scan log writer queue depth/flush latency
 
 KEYBOARD SHORTCUTS (Scanner):
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -0,0 +1,46 @@
+import contextlib
+import os
+import sys
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from config import Config
+from database import create_db_engine, Product
+
+def simulate_requests(engine, requests):
+    """One session per request, like the Flask routes: look up a product by QR code"""
+    Session = sessionmaker(bind=engine)
+    start = time.perf_counter()
+    for i in range(requests):
+        session = Session()
+        try:
+            session.query(Product).filter_by(qr_code=f"{i % 10 + 1}/1/1", is_active=True).first()
+        finally:
+            session.close()
+    return (time.perf_counter() - start) * 1e6 / requests
+
+def run_benchmark(requests=2000):
+    url = Config.DATABASE_URL
+    print(f"Database: {url.split('@')[-1]}")
+    print(f"{requests} requests per configuration\n")
+
+    # echo=True writes to stdout; send it to /dev/null so only formatting and I/O cost is measured
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        before = create_engine(url, echo=True)
+        simulate_requests(before, 50)
+        before_us = simulate_requests(before, requests)
+        before.dispose()
+
+    after = create_db_engine(url)
+    simulate_requests(after, 50)
+    after_us = simulate_requests(after, requests)
+    after.dispose()
+
+    print(f"{'configuration':<40} {'us/request':>11}")
+    print("-" * 52)
+    print(f"{'before: echo=True, default pool':<40} {before_us:>11.0f}")
+    print(f"{'after: tuned pool + slow-query log':<40} {after_us:>11.0f}")
+    print(f"\nSaved {before_us - after_us:.0f} us per request ({before_us / after_us:.1f}x)")
+
+if __name__ == "__main__":
+    run_benchmark(requests=int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,57 @@
+import sys
+import time
+import numpy as np
+from QR_detector import match_products_to_shelves, MAX_SHELF_DX, NO_MATCH_DISTANCE
+
+FRAME_SIZE = (3840, 1080)
+# Codes per frame: products and shelf labels each
+CODE_COUNTS = [10, 50, 200, 500]
+
+def match_loop(product_centers, shelf_centers):
+    """The original nested-loop matcher, kept as the reference"""
+    matches = []
+    for p_center in product_centers:
+        matched, min_distance = -1, NO_MATCH_DISTANCE
+        for index, s_center in enumerate(shelf_centers):
+            dx = abs(p_center[0] - s_center[0])
+            dy = s_center[1] - p_center[1]
+            if dy > 0 and dx < MAX_SHELF_DX:
+                dist = np.sqrt(dx**2 + dy**2)
+                if dist < min_distance:
+                    min_distance, matched = dist, index
+        matches.append(matched)
+    return matches
+
+def make_aisle(rng, count):
+    """Products scattered over a wide aisle, each shelf label somewhere below a product"""
+    width, height = FRAME_SIZE
+    products = np.column_stack([rng.uniform(0, width, count), rng.uniform(0, height * 0.6, count)])
+    shelves = products + np.column_stack([rng.normal(0, 60, count), rng.uniform(20, 300, count)])
+    return [tuple(c) for c in products], [tuple(c) for c in rng.permutation(shelves)]
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) * 1000 / repeat, result
+
+def run_benchmark(repeat=5, seed=7):
+    rng = np.random.default_rng(seed)
+    print(f"Frame {FRAME_SIZE[0]}x{FRAME_SIZE[1]}, {repeat} runs per case\n")
+    print(f"{'codes':>6} {'loop ms':>9} {'numpy ms':>9} {'1:1 ms':>9} {'speedup':>8} {'same':>5} {'shared':>7} {'1:1 hits':>9}")
+    print("-" * 70)
+    for count in CODE_COUNTS:
+        products, shelves = make_aisle(rng, count)
+        loop_ms, expected = timed(lambda: match_loop(products, shelves), repeat)
+        numpy_ms, nearest = timed(lambda: match_products_to_shelves(products, shelves), repeat)
+        assign_ms, assigned = timed(lambda: match_products_to_shelves(products, shelves, one_to_one=True), repeat)
+
+        same = list(nearest) == expected
+        # Extra products piled onto an already-claimed shelf by nearest matching; 1:1 never does this
+        matched = nearest[nearest >= 0]
+        shared = len(matched) - len(set(matched))
+        print(f"{count:>6} {loop_ms:>9.2f} {numpy_ms:>9.2f} {assign_ms:>9.2f} "
+              f"{loop_ms / numpy_ms:>7.1f}x {'yes' if same else 'NO':>5} {shared:>7} {int((assigned >= 0).sum()):>9}")
+
+if __name__ == "__main__":
+    run_benchmark(repeat=int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,80 @@
+import glob
+import os
+import sys
+import time
+import cv2
+import numpy as np
+from qr_scanner import PyramidDetector
+
+CAMERA_SIZE = (1920, 1080)
+ROBOT_FRAME_SIZE = (800, 600)
+# Simulated distance (m) -> printed code size in camera pixels
+DISTANCES = [(1, 600), (2, 300), (3, 200), (4, 150), (6, 100), (8, 75)]
+
+def load_codes(qr_dir="qr_codes"):
+    codes = []
+    for path in sorted(glob.glob(os.path.join(qr_dir, "*.png"))):
+        image = cv2.imread(path)
+        if image is None:
+            continue
+        expected = os.path.splitext(os.path.basename(path))[0].split("_")[-1].replace("-", "/")
+        codes.append((image, expected))
+    return codes
+
+def make_scene(rng, code=None, size=None):
+    width, height = CAMERA_SIZE
+    scene = np.full((height, width, 3), rng.integers(90, 170), np.uint8)
+    cv2.randn(scene, (128, 128, 128), (25, 25, 25))
+    scene = cv2.GaussianBlur(scene, (0, 0), 3)
+
+    if code is not None:
+        patch = cv2.resize(code, (size, size), interpolation=cv2.INTER_AREA)
+        x = int(rng.integers(0, width - size))
+        y = int(rng.integers(0, height - size))
+        scene[y:y + size, x:x + size] = patch
+
+    scene = cv2.GaussianBlur(scene, (0, 0), 0.8)
+    noise = rng.normal(0, 4, scene.shape)
+    return np.clip(scene + noise, 0, 255).astype(np.uint8)
+
+def strategies():
+    resize_decoder = cv2.QRCodeDetector()
+    full_decoder = cv2.QRCodeDetector()
+    pyramid = PyramidDetector()
+    return [
+        ("resize 800x600", lambda frame: resize_decoder.detectAndDecode(cv2.resize(frame, ROBOT_FRAME_SIZE))[0]),
+        ("full resolution", lambda frame: full_decoder.detectAndDecode(frame)[0]),
+        ("pyramid", lambda frame: pyramid.detectAndDecode(frame)[0]),
+    ]
+
+def run_benchmark(trials=1, seed=7):
+    codes = load_codes()
+    if not codes:
+        print("No QR code images found in qr_codes/. Run: python generate_qr.py")
+        return
+
+    rng = np.random.default_rng(seed)
+    scenarios = []
+    for distance, size in DISTANCES:
+        frames = [(make_scene(rng, image, size), expected) for image, expected in codes for _ in range(trials)]
+        scenarios.append((f"{distance} m ({size}px)", frames))
+    scenarios.append(("no code", [(make_scene(rng), None) for _ in range(len(codes))]))
+
+    print(f"Camera {CAMERA_SIZE[0]}x{CAMERA_SIZE[1]}, {len(codes)} codes x {trials} placements per distance\n")
+    print(f"{'scenario':<16} {'strategy':<16} {'ms/frame':>9} {'decoded':>9}")
+    print("-" * 54)
+    for name, frames in scenarios:
+        for strategy, detect in strategies():
+            decoded = 0
+            start = time.perf_counter()
+            for frame, expected in frames:
+                data = detect(frame)
+                if expected is not None and data.strip() == expected:
+                    decoded += 1
+            elapsed_ms = (time.perf_counter() - start) * 1000 / len(frames)
+            rate = f"{decoded / len(frames):.0%}" if frames[0][1] is not None else "-"
+            print(f"{name:<16} {strategy:<16} {elapsed_ms:>9.1f} {rate:>9}")
+        print()
+
+if __name__ == "__main__":
+    run_benchmark(trials=int(sys.argv[1]) if len(sys.argv) > 1 else 1)
@@ -0,0 +1,168 @@
+import hashlib
+import threading
+import time
+from collections import namedtuple
+from sqlalchemy import func, select
+from database import get_session, Product, Category, Location
+from config import Config
+
+CachedProduct = namedtuple('CachedProduct', [
+    'id', 'name', 'sku', 'category_id', 'location_id', 'quantity', 'price', 'qr_code'
+])
+CachedCategory = namedtuple('CachedCategory', ['id', 'name'])
+CachedLocation = namedtuple('CachedLocation', ['id', 'shelf_number', 'block', 'zone', 'full_location'])
+# Everything a listing needs, swapped in as one object so readers never mix two loads
+CatalogSnapshot = namedtuple('CatalogSnapshot', ['tag', 'products', 'categories', 'locations'])
+
+class CatalogCache:
+    """Process-wide snapshot of active products, categories and locations"""
+
+    def __init__(self, refresh_interval=Config.CATALOG_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.products_by_qr = {}
+        self.products_by_id = {}
+        self.categories = {}
+        self.locations = {}
+        self.version = None
+        self.snapshot = CatalogSnapshot('', (), {}, {})
+        self.generation = 0
+        self.loaded = False
+        self.last_check = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.check_failures = 0
+        self.last_error = None
+
+    def _fetch_version(self, session):
+        return session.execute(select(
+            select(func.max(Product.updated_at)).scalar_subquery(),
+            select(func.count(Product.id)).scalar_subquery(),
+            select(func.count(Category.id)).scalar_subquery(),
+            select(func.count(Location.id)).scalar_subquery()
+        )).one()
+
+    def _load(self, session, version):
+        products_by_qr, products_by_id = {}, {}
+        for p in session.query(Product).filter_by(is_active=True):
+            cached = CachedProduct(p.id, p.name, p.sku, p.category_id, p.location_id,
+                                   p.quantity, p.price, p.qr_code)
+            products_by_qr[p.qr_code] = cached
+            products_by_id[p.id] = cached
+
+        categories = {c.id: CachedCategory(c.id, c.name) for c in session.query(Category)}
+        locations = {
+            l.id: CachedLocation(l.id, l.shelf_number, l.block, l.zone, l.full_location)
+            for l in session.query(Location)
+        }
+
+        self.products_by_qr = products_by_qr
+        self.products_by_id = products_by_id
+        self.categories = categories
+        self.locations = locations
+        self.version = tuple(version)
+        products = tuple(sorted(products_by_id.values(), key=lambda p: p.id))
+        # Hash of the content itself, so category/location renames change it too and every
+        # server process agrees on it
+        content = (products, tuple(sorted(categories.items())), tuple(sorted(locations.items())))
+        tag = hashlib.sha1(repr(content).encode()).hexdigest()[:16]
+        self.snapshot = CatalogSnapshot(tag, products, categories, locations)
+        self.generation += 1
+        self.reloads += 1
+        self.loaded = True
+        self.changed.notify_all()
+
+    def refresh(self, force=False):
+        now = time.time()
+        if not force and self.loaded and now - self.last_check < self.refresh_interval:
+            return
+        # With a snapshot in memory, requests never queue behind another thread's version check
+        if not self.lock.acquire(blocking=force or not self.loaded):
+            return
+        try:
+            if not force and self.loaded and now - self.last_check < self.refresh_interval:
+                return
+            session = get_session()
+            try:
+                version = self._fetch_version(session)
+                if force or not self.loaded or tuple(version) != self.version:
+                    self._load(session, version)
+                self.last_error = None
+            except Exception as e:
+                if not self.loaded:
+                    raise
+                # The catalog in memory stays usable; try the database again next interval
+                self.last_error = str(e)
+                self.check_failures += 1
+                print(f"⚠️ Catalog refresh failed, serving the cached catalog: {e}")
+            finally:
+                self.last_check = time.time()
+                session.close()
+        finally:
+            self.lock.release()
+
+    def invalidate(self):
+        with self.lock:
+            self.last_check = 0.0
+        self.refresh(force=True)
+
+    def wait_for_change(self, since, timeout):
+        """Long-poll until the snapshot tag differs from since; returns the current tag.
+
+        The tag is a hash of the catalog content, so it survives restarts and
+        agrees across server processes, unlike the local reload generation.
+        """
+        deadline = time.time() + timeout
+        self.refresh()
+        while self.snapshot.tag == since:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            with self.changed:
+                self.changed.wait_for(lambda: self.snapshot.tag != since,
+                                      timeout=min(remaining, self.refresh_interval))
+            self.refresh()
+        return self.snapshot.tag
+
+    def get_product(self, qr_data, product_id=None):
+        self.refresh()
+        product = self.products_by_qr.get(qr_data)
+        if product is None and product_id is not None:
+            product = self.products_by_id.get(product_id)
+        if product is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return product
+
+    def get_snapshot(self):
+        self.refresh()
+        return self.snapshot
+    
+    def get_category(self, category_id):
+        self.refresh()
+        return self.categories.get(category_id)
+
+    def get_location(self, location_id):
+        self.refresh()
+        return self.locations.get(location_id)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'reloads': self.reloads,
+            'generation': self.generation,
+            'products': len(self.products_by_id),
+            'categories': len(self.categories),
+            'locations': len(self.locations),
+            'last_check': self.last_check,
+            'check_failures': self.check_failures,
+            'last_error': self.last_error
+        }
+
+catalog = CatalogCache()
@@ -11,3 +11,27 @@ class Config:
     HOST = os.getenv('HOST', '0.0.0.0')
     PORT = int(os.getenv('PORT', 5000))
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024
+    CATALOG_REFRESH_INTERVAL = float(os.getenv('CATALOG_REFRESH_INTERVAL', 5.0))
+    SCAN_LOG_QUEUE_SIZE = int(os.getenv('SCAN_LOG_QUEUE_SIZE', 10000))
+    SCAN_LOG_BATCH_SIZE = int(os.getenv('SCAN_LOG_BATCH_SIZE', 500))
+    SCAN_LOG_FLUSH_INTERVAL = float(os.getenv('SCAN_LOG_FLUSH_INTERVAL', 0.5))
+    SCAN_LOG_ENQUEUE_TIMEOUT = float(os.getenv('SCAN_LOG_ENQUEUE_TIMEOUT', 0.05))
+    VERIFY_BATCH_MAX = int(os.getenv('VERIFY_BATCH_MAX', 256))
+    VIDEO_PASSTHROUGH = os.getenv('VIDEO_PASSTHROUGH', 'true').lower() in ('1', 'true', 'yes')
+    STREAM_IDLE_TIMEOUT = float(os.getenv('STREAM_IDLE_TIMEOUT', 60.0))
+    STREAM_SWEEP_INTERVAL = float(os.getenv('STREAM_SWEEP_INTERVAL', 10.0))
+    CATALOG_WATCH_MAX_TIMEOUT = float(os.getenv('CATALOG_WATCH_MAX_TIMEOUT', 60.0))
+    SQL_ECHO = os.getenv('SQL_ECHO', 'false').lower() in ('1', 'true', 'yes')
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200.0))
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30.0))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 3600))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 5000))
+    SCAN_LOG_PARTITION_INTERVAL = os.getenv('SCAN_LOG_PARTITION_INTERVAL', 'day')
+    SCAN_LOG_PARTITIONS_AHEAD = int(os.getenv('SCAN_LOG_PARTITIONS_AHEAD', 7))
+    SCAN_LOG_RETENTION_DAYS = int(os.getenv('SCAN_LOG_RETENTION_DAYS', 90))
+    SCAN_LOG_MAINTENANCE_INTERVAL = float(os.getenv('SCAN_LOG_MAINTENANCE_INTERVAL', 3600.0))
+    SCAN_HISTORY_MAX_LIMIT = int(os.getenv('SCAN_HISTORY_MAX_LIMIT', 200))
+    PRODUCTS_MAX_LIMIT = int(os.getenv('PRODUCTS_MAX_LIMIT', 500))
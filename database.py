@@ -1,10 +1,13 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, ForeignKey, Float
+import logging
+import time
+from sqlalchemy import create_engine, event, text, Column, Integer, String, Date, DateTime, Boolean, ForeignKey, Float, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
 from config import Config
 
 Base = declarative_base()
+slow_query_log = logging.getLogger('warehouse.sql.slow')
 
 class Category(Base):
     __tablename__ = 'categories'
@@ -51,7 +54,17 @@ class Product(Base):
     category = relationship('Category', back_populates='products')
     location = relationship('Location', back_populates='products')
     scans = relationship('ScanLog', back_populates='product')
+    
+    # Partial indexes: only active products are ever looked up or counted
+    __table_args__ = (
+        Index('ix_products_active_qr_code', 'qr_code', postgresql_include=['id', 'location_id'],
+              postgresql_where=text('is_active'), sqlite_where=text('is_active')),
+        Index('ix_products_active_id', 'id',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active')),
+    )
 
+# On PostgreSQL, migration 003 turns scan_logs into a table range-partitioned by
+# timestamp with primary key (id, timestamp); partitions.py maintains the partitions.
 class ScanLog(Base):
     __tablename__ = 'scan_logs'
     
@@ -65,8 +78,78 @@ class ScanLog(Base):
     timestamp = Column(DateTime, default=datetime.utcnow)
     
     product = relationship('Product', back_populates='scans')
+    
+    __table_args__ = (
+        Index('ix_scan_logs_timestamp_id', timestamp.desc(), id.desc()),
+        Index('ix_scan_logs_product_id', 'product_id'),
+    )
+
+class ScanLogDailySummary(Base):
+    __tablename__ = 'scan_log_daily_summary'
+    
+    # Rolled up from scan_logs partitions before they are dropped; 0 ids mean unknown
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    scanned_location_id = Column(Integer, primary_key=True)
+    status = Column(String(20), primary_key=True)
+    scan_count = Column(Integer, nullable=False, default=0)
+    correct_count = Column(Integer, nullable=False, default=0)
+    first_scan = Column(DateTime)
+    last_scan = Column(DateTime)
+
+def log_slow_queries(engine, threshold_ms=Config.SLOW_QUERY_MS):
+    """Log statements slower than threshold_ms as one key=value line each"""
+    
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        # Statements on one connection never overlap, so a single start time is enough
+        conn.info['query_start'] = time.perf_counter()
+    
+    @event.listens_for(engine, 'handle_error')
+    def clear_timer(exception_context):
+        # after_cursor_execute does not fire for failed statements
+        if exception_context.connection is not None:
+            exception_context.connection.info.pop('query_start', None)
+    
+    @event.listens_for(engine, 'after_cursor_execute')
+    def check_duration(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop('query_start', None)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms >= threshold_ms:
+            slow_query_log.warning(
+                'slow_query duration_ms=%.1f rows=%s executemany=%s statement="%s"',
+                elapsed_ms, cursor.rowcount, executemany, ' '.join(statement.split())[:500]
+            )
+
+def create_db_engine(url=Config.DATABASE_URL, statement_timeout_ms=Config.DB_STATEMENT_TIMEOUT_MS):
+    options = {'echo': Config.SQL_ECHO, 'pool_pre_ping': Config.DB_POOL_PRE_PING}
+    if not url.startswith('sqlite'):
+        options.update(
+            pool_size=Config.DB_POOL_SIZE,
+            max_overflow=Config.DB_MAX_OVERFLOW,
+            pool_timeout=Config.DB_POOL_TIMEOUT,
+            pool_recycle=Config.DB_POOL_RECYCLE
+        )
+    if url.startswith('postgres') and statement_timeout_ms > 0:
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout_ms}'}
+    
+    engine = create_engine(url, **options)
+    if Config.SLOW_QUERY_MS > 0:
+        log_slow_queries(engine, Config.SLOW_QUERY_MS)
+    return engine
+
+def disable_statement_timeout(conn):
+    """Lift the statement timeout for the rest of the current transaction only"""
+    if conn.dialect.name == 'postgresql':
+        conn.exec_driver_sql("SET LOCAL statement_timeout = 0")
+
+def create_maintenance_engine(url=Config.DATABASE_URL):
+    """Engine without DB_STATEMENT_TIMEOUT_MS, for migrations and bulk maintenance that run for minutes"""
+    return create_db_engine(url, statement_timeout_ms=0)
 
-engine = create_engine(Config.DATABASE_URL, echo=True)
+engine = create_db_engine()
 Session = sessionmaker(bind=engine)
 
 def init_db():
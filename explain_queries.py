@@ -0,0 +1,84 @@
+import sys
+import time
+from sqlalchemy import text
+from database import create_maintenance_engine
+
+# Seeding 10M rows and EXPLAIN ANALYZE take far longer than the app's statement timeout
+engine = create_maintenance_engine()
+
+SEED_ROWS = 10_000_000
+SEED_TAG = 'explain-seed'
+
+# The hot queries behind /scan_history, /verify_qr and the dashboard
+QUERIES = [
+    ('scan history page',
+     "SELECT id, qr_data, status, timestamp FROM scan_logs ORDER BY timestamp DESC, id DESC LIMIT 50", {}),
+    ('scan history for one product',
+     "SELECT id, status, timestamp FROM scan_logs WHERE product_id = :product_id "
+     "ORDER BY timestamp DESC LIMIT 50", {'product_id': 1}),
+    ('verify by QR code',
+     "SELECT id, location_id FROM products WHERE qr_code = :qr_code AND is_active", {'qr_code': '1/1/1'}),
+    ('verify by product id',
+     "SELECT * FROM products WHERE id = :product_id AND is_active", {'product_id': 1}),
+    ('dashboard active product count',
+     "SELECT count(*) FROM products WHERE is_active", {}),
+]
+
+def seed(conn, rows):
+    """Fill scan_logs with rows spread over the last year, using existing products and locations"""
+    existing = conn.execute(text("SELECT count(*) FROM scan_logs WHERE qr_data = :tag"), {'tag': SEED_TAG}).scalar()
+    if existing >= rows:
+        print(f"📊 {existing:,} seeded rows already present")
+        return
+
+    print(f"🌱 Seeding {rows - existing:,} scan log rows (this takes a few minutes)...")
+    start = time.time()
+    conn.execute(text("""
+        INSERT INTO scan_logs (product_id, qr_data, scanned_location_id, is_correct_location, status, message, timestamp)
+        SELECT p.ids[1 + (g % array_length(p.ids, 1))],
+               :tag,
+               l.ids[1 + (g % array_length(l.ids, 1))],
+               g % 10 <> 0,
+               CASE WHEN g % 10 <> 0 THEN 'correct' ELSE 'misplaced' END,
+               NULL,
+               now() - (g * interval '3 seconds')
+        FROM generate_series(1, :count) AS g,
+             (SELECT array_agg(id) AS ids FROM products) AS p,
+             (SELECT array_agg(id) AS ids FROM locations) AS l
+    """), {'tag': SEED_TAG, 'count': rows - existing})
+    conn.execute(text("ANALYZE scan_logs"))
+    conn.execute(text("ANALYZE products"))
+    print(f"✅ Seeded in {time.time() - start:.0f}s")
+
+def explain(conn):
+    for title, sql, params in QUERIES:
+        print("\n" + "=" * 70)
+        print(f"  {title}")
+        print("=" * 70)
+        print(sql)
+        plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params).scalars()
+        print("\n".join(plan))
+
+def cleanup(conn):
+    deleted = conn.execute(text("DELETE FROM scan_logs WHERE qr_data = :tag"), {'tag': SEED_TAG}).rowcount
+    conn.execute(text("VACUUM ANALYZE scan_logs"))
+    print(f"🧹 Removed {deleted:,} seeded rows")
+
+def main(args):
+    if engine.dialect.name != 'postgresql':
+        print("❌ explain_queries.py needs PostgreSQL (generate_series and EXPLAIN ANALYZE output)")
+        return 1
+
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        if 'cleanup' in args:
+            cleanup(conn)
+            return 0
+        rows = int(args[0]) if args and args[0].isdigit() else SEED_ROWS
+        seed(conn, rows)
+        explain(conn)
+    print("\nRun 'python migrate.py' first if the plans show Seq Scan on scan_logs or products.")
+    print("Remove the seeded rows with: python explain_queries.py cleanup")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
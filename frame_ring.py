@@ -0,0 +1,97 @@
+import threading
+import numpy as np
+from multiprocessing import shared_memory
+
+class FrameRing:
+    """Fixed set of preallocated frame buffers addressed by slot index.
+
+    A producer acquire()s a free slot, writes into view(slot) and hands the
+    index to consumers instead of the array. Slots are reference counted:
+    retain() adds a reader, release() drops one, and the slot becomes free
+    again at zero. When every slot is still referenced, acquire() returns
+    None and the overrun is counted so the caller can drop the frame.
+
+    With shared=True the buffers live in multiprocessing shared memory and
+    worker processes can map them with FrameRing.attach(). Reference counts
+    are kept by the creating process only.
+    """
+
+    def __init__(self, slots, shape, dtype=np.uint8, shared=False):
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self.shm = None
+        if shared:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.frame_bytes * slots)
+            self.frames = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=self.shm.buf)
+        else:
+            self.frames = np.empty((slots,) + self.shape, dtype=self.dtype)
+
+        self.lock = threading.Lock()
+        self.refs = [0] * slots
+        self.cursor = 0
+        self.acquired = 0
+        self.overruns = 0
+
+    @property
+    def name(self):
+        return self.shm.name if self.shm is not None else None
+
+    @staticmethod
+    def attach(name, slots, shape, dtype=np.uint8):
+        """Map the slots of a shared ring created by another process"""
+        shm = shared_memory.SharedMemory(name=name)
+        frames = np.ndarray((slots,) + tuple(shape), dtype=np.dtype(dtype), buffer=shm.buf)
+        return shm, frames
+
+    def view(self, slot):
+        return self.frames[slot]
+
+    def acquire(self):
+        with self.lock:
+            for offset in range(self.slots):
+                slot = (self.cursor + offset) % self.slots
+                if self.refs[slot] == 0:
+                    self.refs[slot] = 1
+                    self.cursor = (slot + 1) % self.slots
+                    self.acquired += 1
+                    return slot
+            self.overruns += 1
+            return None
+
+    def retain(self, slot):
+        with self.lock:
+            self.refs[slot] += 1
+
+    def release(self, slot):
+        with self.lock:
+            if self.refs[slot] > 0:
+                self.refs[slot] -= 1
+
+    def write(self, frame):
+        """Copy frame into a free slot and return the slot, or None on overrun"""
+        slot = self.acquire()
+        if slot is not None:
+            np.copyto(self.frames[slot], frame)
+        return slot
+
+    def free_slots(self):
+        with self.lock:
+            return self.refs.count(0)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'slots': self.slots,
+                'in_use': self.slots - self.refs.count(0),
+                'acquired': self.acquired,
+                'overruns': self.overruns
+            }
+
+    def close(self):
+        if self.shm is not None:
+            self.frames = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
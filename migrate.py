@@ -0,0 +1,160 @@
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import MetaData, Table, Column, String, DateTime, select, insert, text
+from sqlalchemy.schema import CreateIndex
+from database import create_maintenance_engine, disable_statement_timeout, Base, ScanLog, ScanLogDailySummary
+from config import Config
+import partitions
+
+# Index builds and table copies on a large scan_logs outlast the app's statement timeout
+engine = create_maintenance_engine()
+
+migrations_metadata = MetaData()
+schema_migrations = Table(
+    'schema_migrations', migrations_metadata,
+    Column('version', String(100), primary_key=True),
+    Column('description', String(500)),
+    Column('applied_at', DateTime, default=datetime.utcnow)
+)
+
+def invalid_indexes(conn, names):
+    """Names among names left INVALID by an interrupted CREATE INDEX CONCURRENTLY"""
+    if conn.dialect.name != 'postgresql':
+        return []
+    return list(conn.execute(text("""
+        SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE NOT i.indisvalid AND c.relname = ANY(:names)
+    """), {'names': list(names)}).scalars())
+
+def create_indexes(*names):
+    """Migration step that creates the named model indexes if they are missing"""
+
+    def step(conn):
+        # IF NOT EXISTS would keep an invalid leftover forever, so rebuild those from scratch
+        for name in invalid_indexes(conn, names):
+            print(f"   Dropping invalid index {name}")
+            conn.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+        indexes = {index.name: index for table in Base.metadata.sorted_tables for index in table.indexes}
+        for name in names:
+            ddl = str(CreateIndex(indexes[name], if_not_exists=True).compile(dialect=conn.dialect))
+            if conn.dialect.name == 'postgresql':
+                # Build without locking writes; scan_logs can be large by the time this runs
+                ddl = ddl.replace('CREATE INDEX', 'CREATE INDEX CONCURRENTLY', 1)
+            print(f"   {ddl}")
+            conn.exec_driver_sql(ddl)
+
+        invalid = invalid_indexes(conn, names)
+        if invalid:
+            raise RuntimeError(f"Index build left invalid index(es): {', '.join(invalid)}")
+    return step
+
+def create_daily_summary(conn):
+    ScanLogDailySummary.__table__.create(conn, checkfirst=True)
+
+def partition_scan_logs(conn):
+    """Rebuild scan_logs as a table range-partitioned by timestamp, keeping ids and rows"""
+    if conn.dialect.name != 'postgresql':
+        print("   Skipped: partitioning needs PostgreSQL")
+        return
+    if partitions.is_partitioned(conn):
+        print("   scan_logs is already partitioned")
+        return
+    # Copying months of scan logs takes minutes, whichever engine runs the migration
+    disable_statement_timeout(conn)
+
+    sequence = conn.execute(text("SELECT pg_get_serial_sequence('scan_logs', 'id')")).scalar()
+    conn.execute(text("ALTER TABLE scan_logs RENAME TO scan_logs_unpartitioned"))
+    conn.execute(text("ALTER TABLE scan_logs_unpartitioned RENAME CONSTRAINT scan_logs_pkey TO scan_logs_unpartitioned_pkey"))
+    for index in ScanLog.__table__.indexes:
+        conn.execute(text(f"ALTER INDEX IF EXISTS {index.name} RENAME TO {index.name}_unpartitioned"))
+
+    # The partition key has to be part of the primary key
+    conn.execute(text(f"""
+        CREATE TABLE scan_logs (
+            id INTEGER NOT NULL DEFAULT nextval('{sequence}'::regclass),
+            product_id INTEGER REFERENCES products (id),
+            qr_data VARCHAR(200) NOT NULL,
+            scanned_location_id INTEGER REFERENCES locations (id),
+            is_correct_location BOOLEAN,
+            status VARCHAR(20),
+            message VARCHAR(500),
+            timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """))
+    conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY scan_logs.id"))
+    for index in ScanLog.__table__.indexes:
+        conn.exec_driver_sql(str(CreateIndex(index).compile(dialect=conn.dialect)))
+
+    oldest, newest = conn.execute(text("SELECT min(timestamp), max(timestamp) FROM scan_logs_unpartitioned")).one()
+    today = datetime.utcnow().date()
+    first_day = oldest.date() if oldest else today
+    last_day = max(newest.date() if newest else today, today) + timedelta(days=Config.SCAN_LOG_PARTITIONS_AHEAD)
+    partitions.ensure_default_partition(conn)
+    created = partitions.ensure_partitions(conn, first_day, last_day)
+    print(f"   Created {len(created)} partition(s) from {first_day} to {last_day}")
+
+    copied = conn.execute(text("""
+        INSERT INTO scan_logs (id, product_id, qr_data, scanned_location_id, is_correct_location, status, message, timestamp)
+        SELECT id, product_id, qr_data, scanned_location_id, is_correct_location, status, message,
+               COALESCE(timestamp, now() AT TIME ZONE 'utc')
+        FROM scan_logs_unpartitioned
+    """)).rowcount
+    conn.execute(text("DROP TABLE scan_logs_unpartitioned"))
+    print(f"   Moved {copied} scan log(s) into partitions")
+
+# (version, description, step, autocommit). Autocommit steps must be idempotent;
+# the others run in a single transaction.
+MIGRATIONS = [
+    ('001_scan_log_and_product_indexes',
+     'scan_logs (timestamp DESC, id DESC) and product_id; partial indexes on active products',
+     create_indexes('ix_scan_logs_timestamp_id', 'ix_scan_logs_product_id',
+                    'ix_products_active_qr_code', 'ix_products_active_id'),
+     True),
+    ('002_scan_log_daily_summary',
+     'Daily scan rollup by product, location and status',
+     create_daily_summary,
+     False),
+    ('003_partition_scan_logs',
+     'Range-partition scan_logs by timestamp (PostgreSQL)',
+     partition_scan_logs,
+     False),
+]
+
+def applied_versions():
+    migrations_metadata.create_all(engine)
+    with engine.connect() as conn:
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+def migrate():
+    applied = applied_versions()
+    pending = [m for m in MIGRATIONS if m[0] not in applied]
+    if not pending:
+        print("✅ Schema is up to date")
+        return 0
+
+    for version, description, step, autocommit in pending:
+        print(f"🔧 Applying {version}: {description}")
+        if autocommit:
+            context = engine.connect().execution_options(isolation_level='AUTOCOMMIT')
+        else:
+            context = engine.begin()
+        with context as conn:
+            step(conn)
+            conn.execute(insert(schema_migrations).values(
+                version=version, description=description, applied_at=datetime.utcnow()))
+    print(f"✅ Applied {len(pending)} migration(s)")
+    return len(pending)
+
+def status():
+    applied = applied_versions()
+    for version, description, _, _ in MIGRATIONS:
+        mark = '✅' if version in applied else '⏳'
+        print(f"{mark} {version} - {description}")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'status':
+        status()
+    else:
+        migrate()
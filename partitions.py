@@ -0,0 +1,188 @@
+import re
+import sys
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from database import engine, disable_statement_timeout, ScanLogDailySummary
+from config import Config
+
+PARENT_TABLE = 'scan_logs'
+DEFAULT_PARTITION = 'scan_logs_default'
+SUMMARY_TABLE = ScanLogDailySummary.__tablename__
+BOUND_PATTERN = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+ROLLUP_SQL = f"""
+    INSERT INTO {SUMMARY_TABLE}
+        (day, product_id, scanned_location_id, status, scan_count, correct_count, first_scan, last_scan)
+    SELECT timestamp::date, COALESCE(product_id, 0), COALESCE(scanned_location_id, 0), COALESCE(status, 'unknown'),
+           count(*), count(*) FILTER (WHERE is_correct_location), min(timestamp), max(timestamp)
+    FROM {{partition}}
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (day, product_id, scanned_location_id, status) DO UPDATE SET
+        scan_count = {SUMMARY_TABLE}.scan_count + EXCLUDED.scan_count,
+        correct_count = {SUMMARY_TABLE}.correct_count + EXCLUDED.correct_count,
+        first_scan = LEAST({SUMMARY_TABLE}.first_scan, EXCLUDED.first_scan),
+        last_scan = GREATEST({SUMMARY_TABLE}.last_scan, EXCLUDED.last_scan)
+"""
+
+def period_start(day, interval=Config.SCAN_LOG_PARTITION_INTERVAL):
+    """First day of the partition containing day; weekly partitions start on Monday"""
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    return day
+
+def period_end(start, interval=Config.SCAN_LOG_PARTITION_INTERVAL):
+    return start + timedelta(days=7 if interval == 'week' else 1)
+
+def partition_name(start):
+    return f"{PARENT_TABLE}_p{start:%Y%m%d}"
+
+def is_partitioned(conn):
+    if conn.dialect.name != 'postgresql':
+        return False
+    return conn.execute(text("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = :table AND pg_table_is_visible(c.oid)
+        )
+    """), {'table': PARENT_TABLE}).scalar()
+
+def list_partitions(conn):
+    """(name, start, end) of every range partition, oldest first; the default partition is skipped"""
+    rows = conn.execute(text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = :table
+    """), {'table': PARENT_TABLE})
+
+    partitions = []
+    for name, bound in rows:
+        match = BOUND_PATTERN.search(bound or '')
+        if match:
+            partitions.append((name, datetime.fromisoformat(match.group(1)), datetime.fromisoformat(match.group(2))))
+    return sorted(partitions, key=lambda p: p[1])
+
+def ensure_default_partition(conn):
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+
+def ensure_partitions(conn, first_day, last_day, interval=Config.SCAN_LOG_PARTITION_INTERVAL):
+    """Create the partitions covering first_day..last_day that do not exist yet"""
+    existing = list_partitions(conn)
+    created = []
+    start = period_start(first_day, interval)
+    while start <= last_day:
+        end = period_end(start, interval)
+        lower, upper = datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.min.time())
+        # Ranges already covered (possibly by partitions of another interval) are left alone
+        if not any(s < upper and e > lower for _, s, e in existing):
+            name = partition_name(start)
+            try:
+                with conn.begin_nested():
+                    conn.execute(text(f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} "
+                                      f"FOR VALUES FROM ('{lower}') TO ('{upper}')"))
+                created.append(name)
+            except Exception as e:
+                # Fails when the default partition already holds rows for this range
+                print(f"⚠️ Could not create partition {name}: {e}")
+        start = end
+    return created
+
+def rollup_and_drop(conn, name):
+    """Fold a partition into the daily summary and drop it, in the caller's transaction"""
+    # A full partition scan outlasts the app's statement timeout
+    disable_statement_timeout(conn)
+    rows = conn.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+    conn.execute(text(ROLLUP_SQL.format(partition=name)))
+    conn.execute(text(f"DROP TABLE {name}"))
+    return rows
+
+def apply_retention(retention_days=Config.SCAN_LOG_RETENTION_DAYS, today=None):
+    """Roll up and drop every partition that ends before the retention cutoff"""
+    if retention_days <= 0:
+        return []
+    today = today or datetime.utcnow().date()
+    cutoff = datetime.combine(today - timedelta(days=retention_days), datetime.min.time())
+
+    with engine.connect() as conn:
+        expired = [(name, end) for name, _, end in list_partitions(conn) if end <= cutoff]
+
+    dropped = []
+    for name, _ in expired:
+        # One transaction per partition so a failure only keeps that partition around
+        with engine.begin() as conn:
+            rows = rollup_and_drop(conn, name)
+        print(f"🗄️ Rolled up {rows} scan(s) from {name} and dropped it")
+        dropped.append(name)
+    return dropped
+
+def run_maintenance(today=None):
+    """Create upcoming partitions and apply retention; no-op unless scan_logs is partitioned"""
+    if engine.dialect.name != 'postgresql':
+        return None
+    today = today or datetime.utcnow().date()
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            print("⚠️ scan_logs is not partitioned yet. Run: python migrate.py")
+            return None
+        ensure_default_partition(conn)
+        created = ensure_partitions(conn, today, today + timedelta(days=Config.SCAN_LOG_PARTITIONS_AHEAD))
+    dropped = apply_retention(today=today)
+    return {'created': created, 'dropped': dropped}
+
+class PartitionMaintenance:
+    """Background thread that runs run_maintenance every interval seconds"""
+
+    def __init__(self, interval=Config.SCAN_LOG_MAINTENANCE_INTERVAL):
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.last_run = None
+        self.last_result = None
+
+    def start(self):
+        if self.interval <= 0 or engine.dialect.name != 'postgresql':
+            return
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name='partition-maintenance', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                self.last_result = run_maintenance()
+                self.last_run = datetime.utcnow()
+            except Exception as e:
+                print(f"❌ Partition maintenance failed: {e}")
+            self.stop_event.wait(self.interval)
+
+    def stop(self, timeout=5):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=timeout)
+
+partition_maintenance = PartitionMaintenance()
+
+def status():
+    if engine.dialect.name != 'postgresql':
+        print("❌ Partitioning needs PostgreSQL")
+        return
+    with engine.connect() as conn:
+        if not is_partitioned(conn):
+            print("⚠️ scan_logs is not partitioned yet. Run: python migrate.py")
+            return
+        for name, start, end in list_partitions(conn):
+            rows = conn.execute(text("SELECT reltuples::bigint FROM pg_class WHERE relname = :name"),
+                                {'name': name}).scalar()
+            print(f"{name:<28} {start:%Y-%m-%d} → {end:%Y-%m-%d}  ~{max(rows, 0)} rows")
+        default_rows = conn.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}")).scalar()
+        print(f"{DEFAULT_PARTITION:<28} {default_rows} rows outside all ranges")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'status':
+        status()
+    else:
+        print(run_maintenance())
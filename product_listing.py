@@ -0,0 +1,46 @@
+import hashlib
+
+PRODUCT_FIELDS = ('id', 'name', 'sku', 'qr_code', 'quantity', 'price', 'category', 'location')
+
+def _category(product, snapshot):
+    category = snapshot.categories.get(product.category_id)
+    return category.name if category else None
+
+def _location(product, snapshot):
+    location = snapshot.locations.get(product.location_id)
+    return location.full_location if location else None
+
+FIELD_GETTERS = {
+    'id': lambda product, snapshot: product.id,
+    'name': lambda product, snapshot: product.name,
+    'sku': lambda product, snapshot: product.sku,
+    'qr_code': lambda product, snapshot: product.qr_code,
+    'quantity': lambda product, snapshot: product.quantity,
+    'price': lambda product, snapshot: product.price,
+    'category': _category,
+    'location': _location
+}
+
+def parse_fields(value):
+    """Comma-separated ?fields= into a tuple of known field names; all fields when empty"""
+    if not value:
+        return PRODUCT_FIELDS
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in FIELD_GETTERS]
+    if unknown or not fields:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(PRODUCT_FIELDS)}")
+    return fields
+
+def products_etag(snapshot, fields, limit, offset):
+    """Changes whenever the catalog or the requested page/fields change"""
+    key = f"{snapshot.tag}|{','.join(fields)}|{limit}|{offset}"
+    return hashlib.sha1(key.encode()).hexdigest()[:24]
+
+def list_products(snapshot, fields, limit=None, offset=0):
+    """One page of active products from a catalog snapshot, ordered by id"""
+    end = offset + limit if limit is not None else None
+    getters = [(field, FIELD_GETTERS[field]) for field in fields]
+    return [
+        {field: getter(product, snapshot) for field, getter in getters}
+        for product in snapshot.products[offset:end]
+    ]
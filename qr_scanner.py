@@ -0,0 +1,265 @@
+import time
+import cv2
+import numpy as np
+
+ROI_PADDING = 0.5
+FULL_SCAN_INTERVAL = 10
+MIN_ROI_SIZE = 120
+CHANGE_THRESHOLD = 3.0
+CHANGE_REFRESH_INTERVAL = 2.0
+CHANGE_SAMPLE_SIZE = (64, 48)
+PYRAMID_BASE_SCALE = 0.5
+PYRAMID_TILE_GRID = (2, 2)
+PYRAMID_TILE_OVERLAP = 0.25
+PYRAMID_TILE_UPSCALE = 1.5
+
+class PyramidDetector:
+    """Coarse-to-fine QR detection with the QRCodeDetector interface.
+
+    A low-resolution pass runs first. Only when it fails but something
+    looks like a QR finder pattern does detection escalate to full
+    resolution: a crop around the located corners, or the tiles that
+    contain candidate finder patterns, upscaled so small codes get enough
+    pixels per module.
+    """
+
+    def __init__(self, base_scale=PYRAMID_BASE_SCALE, tile_grid=PYRAMID_TILE_GRID,
+                 tile_overlap=PYRAMID_TILE_OVERLAP, tile_upscale=PYRAMID_TILE_UPSCALE):
+        self.decoder = cv2.QRCodeDetector()
+        self.base_scale = base_scale
+        self.tile_grid = tile_grid
+        self.tile_overlap = tile_overlap
+        self.tile_upscale = tile_upscale
+
+        self.coarse_hits = 0
+        self.region_hits = 0
+        self.tile_hits = 0
+        self.tiles_scanned = 0
+        self.escalations = 0
+
+    def _decode_region(self, frame, x0, y0, x1, y1, upscale=1.0):
+        region = frame[y0:y1, x0:x1]
+        if region.size == 0:
+            return '', None
+        if upscale != 1.0:
+            region = cv2.resize(region, None, fx=upscale, fy=upscale, interpolation=cv2.INTER_LINEAR)
+        data, points, _ = self.decoder.detectAndDecode(region)
+        if not data or points is None:
+            return '', None
+        return data, points / upscale + np.float32([x0, y0])
+
+    def _finder_candidates(self, gray):
+        """Centers of nested square contours, the signature of a QR finder pattern"""
+        binary = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
+                                       cv2.THRESH_BINARY, 15, 5)
+        contours, hierarchy = cv2.findContours(binary, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+        if hierarchy is None:
+            return []
+
+        hierarchy = hierarchy[0]
+        candidates = []
+        for i, contour in enumerate(contours):
+            child = hierarchy[i][2]
+            if child < 0 or hierarchy[child][2] < 0:
+                continue
+            x, y, w, h = cv2.boundingRect(contour)
+            if w < 4 or h < 4 or not 0.6 < w / h < 1.6:
+                continue
+            candidates.append((x + w / 2, y + h / 2))
+        return candidates
+
+    def _tiles(self, width, height):
+        cols, rows = self.tile_grid
+        tile_w, tile_h = width / cols, height / rows
+        pad_x, pad_y = tile_w * self.tile_overlap / 2, tile_h * self.tile_overlap / 2
+        for row in range(rows):
+            for col in range(cols):
+                yield (max(int(col * tile_w - pad_x), 0), max(int(row * tile_h - pad_y), 0),
+                       min(int((col + 1) * tile_w + pad_x), width), min(int((row + 1) * tile_h + pad_y), height))
+
+    def detectAndDecode(self, frame):
+        height, width = frame.shape[:2]
+        scale = self.base_scale
+        small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale != 1.0 else frame
+
+        data, points, _ = self.decoder.detectAndDecode(small)
+        if data and points is not None:
+            self.coarse_hits += 1
+            return data, points / scale, None
+
+        self.escalations += 1
+        if points is not None:
+            x, y, w, h = cv2.boundingRect(np.int32(points / scale).reshape(-1, 2))
+            pad = max(w, h) // 2
+            upscale = self.tile_upscale if max(w, h) < 150 else 1.0
+            data, full_points = self._decode_region(frame, max(x - pad, 0), max(y - pad, 0),
+                                                    min(x + w + pad, width), min(y + h + pad, height), upscale)
+            if data:
+                self.region_hits += 1
+                return data, full_points, None
+
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        candidates = [(cx / scale, cy / scale) for cx, cy in self._finder_candidates(gray)]
+        if not candidates:
+            return '', None, None
+
+        for x0, y0, x1, y1 in self._tiles(width, height):
+            if not any(x0 <= cx < x1 and y0 <= cy < y1 for cx, cy in candidates):
+                continue
+            self.tiles_scanned += 1
+            data, full_points = self._decode_region(frame, x0, y0, x1, y1, self.tile_upscale)
+            if data:
+                self.tile_hits += 1
+                return data, full_points, None
+
+        return '', None, None
+
+    def stats(self):
+        return {
+            'coarse_hits': self.coarse_hits,
+            'region_hits': self.region_hits,
+            'tile_hits': self.tile_hits,
+            'tiles_scanned': self.tiles_scanned,
+            'escalations': self.escalations
+        }
+
+def create_decoder(strategy='full', **options):
+    """Build a detector for a camera profile: 'full' or 'pyramid'"""
+    if strategy == 'pyramid':
+        return PyramidDetector(**options)
+    if strategy == 'full':
+        return cv2.QRCodeDetector()
+    raise ValueError(f"Unknown detection strategy: {strategy}")
+
+class QRScanner:
+    """Detect-then-track QR scanning.
+
+    After a full-frame hit, following frames are decoded inside a padded
+    region around the last bounding box. A full-frame scan runs every
+    full_scan_interval frames or as soon as the region misses.
+    """
+
+    def __init__(self, roi_padding=ROI_PADDING, full_scan_interval=FULL_SCAN_INTERVAL, use_tracker=False,
+                 decoder=None):
+        self.decoder = decoder if decoder is not None else cv2.QRCodeDetector()
+        self.roi_padding = roi_padding
+        self.full_scan_interval = full_scan_interval
+        self.use_tracker = use_tracker
+
+        self.last_points = None
+        self.prev_gray = None
+        self.frames_since_full = 0
+
+        self.full_scans = 0
+        self.roi_scans = 0
+        self.roi_hits = 0
+        self.tracked = 0
+
+    def reset(self):
+        self.last_points = None
+        self.prev_gray = None
+        self.frames_since_full = 0
+
+    def _roi(self, shape):
+        height, width = shape[:2]
+        x, y, w, h = cv2.boundingRect(np.int32(self.last_points).reshape(-1, 2))
+        pad_x = max(int(w * self.roi_padding), (MIN_ROI_SIZE - w) // 2, 0)
+        pad_y = max(int(h * self.roi_padding), (MIN_ROI_SIZE - h) // 2, 0)
+        x0, y0 = max(x - pad_x, 0), max(y - pad_y, 0)
+        x1, y1 = min(x + w + pad_x, width), min(y + h + pad_y, height)
+        return x0, y0, x1, y1
+
+    def _track(self, gray):
+        points = np.float32(self.last_points).reshape(-1, 1, 2)
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, points, None)
+        if moved is not None and status is not None and status.all():
+            self.last_points = moved.reshape(1, -1, 2)
+            self.tracked += 1
+
+    def _full_scan(self, frame):
+        self.full_scans += 1
+        self.frames_since_full = 0
+        data, points, _ = self.decoder.detectAndDecode(frame)
+        self.last_points = points if data else None
+        return data, points
+
+    def detect(self, frame):
+        """Return (data, points) like QRCodeDetector.detectAndDecode, in full-frame coordinates"""
+        gray = None
+        if self.use_tracker:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+            if self.last_points is not None and self.prev_gray is not None:
+                self._track(gray)
+            self.prev_gray = gray
+
+        if self.last_points is None or self.frames_since_full >= self.full_scan_interval:
+            return self._full_scan(frame)
+
+        self.roi_scans += 1
+        self.frames_since_full += 1
+        x0, y0, x1, y1 = self._roi(frame.shape)
+        data, points, _ = self.decoder.detectAndDecode(frame[y0:y1, x0:x1])
+        if data and points is not None:
+            self.roi_hits += 1
+            points = points + np.float32([x0, y0])
+            self.last_points = points
+            return data, points
+
+        return self._full_scan(frame)
+
+    def stats(self):
+        stats = {
+            'full_scans': self.full_scans,
+            'roi_scans': self.roi_scans,
+            'roi_hit_rate': round(self.roi_hits / self.roi_scans, 3) if self.roi_scans else 0.0,
+            'tracked': self.tracked
+        }
+        if hasattr(self.decoder, 'stats'):
+            stats.update(self.decoder.stats())
+        return stats
+
+class ChangeDetector:
+    """Gate expensive decoding on whether the scene changed.
+
+    Frames are reduced to a small grayscale thumbnail and compared with the
+    thumbnail of the last frame that was processed. threshold is the mean
+    absolute pixel difference (0-255) that counts as a change; a frame is
+    always processed after refresh_interval seconds regardless.
+    """
+
+    def __init__(self, threshold=CHANGE_THRESHOLD, refresh_interval=CHANGE_REFRESH_INTERVAL,
+                 sample_size=CHANGE_SAMPLE_SIZE):
+        self.threshold = threshold
+        self.refresh_interval = refresh_interval
+        self.sample_size = sample_size
+        self.reference = None
+        self.last_processed = 0.0
+        self.processed = 0
+        self.skipped = 0
+
+    def reset(self):
+        self.reference = None
+
+    def should_process(self, frame, now=None):
+        now = time.time() if now is None else now
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        sample = cv2.resize(gray, self.sample_size, interpolation=cv2.INTER_AREA)
+
+        if (self.reference is not None
+                and now - self.last_processed < self.refresh_interval
+                and cv2.absdiff(sample, self.reference).mean() < self.threshold):
+            self.skipped += 1
+            return False
+
+        self.reference = sample
+        self.last_processed = now
+        self.processed += 1
+        return True
+
+    def stats(self):
+        total = self.processed + self.skipped
+        return {
+            'frames_processed': self.processed,
+            'frames_skipped': self.skipped,
+            'skip_rate': round(self.skipped / total, 3) if total else 0.0
+        }
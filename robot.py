@@ -2,72 +2,454 @@ import cv2
 import numpy as np
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import struct
 from io import BytesIO
 import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from qr_scanner import QRScanner, ChangeDetector, create_decoder
+from frame_ring import FrameRing
 
 SERVER_URL = "http://localhost:5000"
+ROBOT_ID = None
 UPLOAD_INTERVAL = 0.1
+UPLOAD_MODE = "stream"  # "stream" keeps one chunked POST open, "multipart" posts every frame
+STREAM_UPLOAD_INTERVAL = 1 / 30
+STREAM_RECONNECT_MAX = 5.0
+FRAME_HEADER = struct.Struct('>I')
 VERIFY_COOLDOWN = 2.0
+HTTP_POOL_SIZE = 4
+HTTP_RETRIES = 2
+HTTP_BACKOFF = 0.2
+VERIFY_WORKERS = 2
+VERIFY_CACHE_TTL = 300.0
+VERIFY_CACHE_SIZE = 1024
+CATALOG_WATCH_TIMEOUT = 30.0
+CACHEABLE_STATUSES = ('correct', 'misplaced', 'not_found', 'invalid')
+# Per-camera capture size and detection strategy; frame_size None keeps native resolution.
+# See benchmark_scanner.py for the speed/decode-rate trade-off of each strategy.
+CAMERA_PROFILES = {
+    'default': {'frame_size': (800, 600), 'strategy': 'full'},
+    'hd': {'frame_size': (1280, 720), 'strategy': 'pyramid', 'base_scale': 0.5,
+           'tile_grid': (2, 2), 'tile_upscale': 1.5},
+    'wide': {'frame_size': None, 'strategy': 'pyramid', 'base_scale': 0.4,
+             'tile_grid': (3, 2), 'tile_upscale': 2.0},
+}
+CAMERA_PROFILE = 'default'
+STATS_INTERVAL = 5.0
+# Capture + newest + detection + upload + display, with one spare
+FRAME_RING_SLOTS = 6
+ROI_PADDING = 0.5
+FULL_SCAN_INTERVAL = 10
+USE_TRACKER = True
+CHANGE_THRESHOLD = 3.0  # mean grayscale difference that wakes the decoder; 0 disables gating
+CHANGE_REFRESH_INTERVAL = 2.0
+
+def create_http_session(pool_size=HTTP_POOL_SIZE, retries=HTTP_RETRIES, backoff=HTTP_BACKOFF):
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=(502, 503, 504),
+        # Connect errors are retried for every method, since the request never left.
+        # A 5xx on POST may come from a proxy after Flask already logged the scan, so
+        # /verify_qr and /scan_event are not resent on status codes.
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+class FrameSlot:
+    """Holds the ring slot of the newest frame; older frames go back to the ring"""
+    
+    def __init__(self, ring=None):
+        self.cond = threading.Condition()
+        self.ring = ring
+        self.slot = None
+        self.seq = 0
+    
+    def put(self, slot):
+        with self.cond:
+            previous = self.slot
+            self.slot = slot
+            self.seq += 1
+            self.cond.notify_all()
+        if previous is not None:
+            self.ring.release(previous)
+    
+    def get(self, last_seq=0, timeout=0.1):
+        """Wait for a slot newer than last_seq; the caller must release it and not modify the frame"""
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq != last_seq, timeout=timeout)
+            if self.slot is None or self.seq == last_seq:
+                return None, last_seq
+            self.ring.retain(self.slot)
+            return self.slot, self.seq
+
+class RateCounter:
+    def __init__(self, window=2.0):
+        self.window = window
+        self.count = 0
+        self.rate = 0.0
+        self.window_start = time.time()
+        self.window_count = 0
+    
+    def tick(self):
+        self.count += 1
+        self.window_count += 1
+        elapsed = time.time() - self.window_start
+        if elapsed >= self.window:
+            self.rate = self.window_count / elapsed
+            self.window_start = time.time()
+            self.window_count = 0
+
+class VerificationCache:
+    """TTL + LRU cache of server verification results keyed by QR string"""
+    
+    def __init__(self, ttl=VERIFY_CACHE_TTL, max_size=VERIFY_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.catalog_version = None
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, qr_data):
+        with self.lock:
+            entry = self.entries.get(qr_data)
+            if entry is None or time.time() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self.entries[qr_data]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(qr_data)
+            self.hits += 1
+            return entry[1]
+    
+    def put(self, qr_data, result):
+        with self.lock:
+            self.entries[qr_data] = (time.time(), result)
+            self.entries.move_to_end(qr_data)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+    
+    def observe_version(self, version):
+        """Drop every entry when the server reports a different catalog version"""
+        if version is None:
+            return
+        with self.lock:
+            if self.catalog_version is not None and version != self.catalog_version:
+                self.entries.clear()
+                print("🔄 Catalog changed on server, verification cache cleared")
+            self.catalog_version = version
 
 class WarehouseRobot:
-    def __init__(self, camera_source=0, server_url=SERVER_URL):
+    def __init__(self, camera_source=0, server_url=SERVER_URL, robot_id=ROBOT_ID, upload_mode=UPLOAD_MODE,
+                 pool_size=HTTP_POOL_SIZE, http_retries=HTTP_RETRIES, http_backoff=HTTP_BACKOFF,
+                 camera_profile=CAMERA_PROFILE):
         self.camera_source = camera_source
         self.server_url = server_url
+        self.robot_id = robot_id
+        self.upload_mode = upload_mode
+        self.upload_url = f"{server_url}/upload_frame/{robot_id}" if robot_id else f"{server_url}/upload_frame"
+        self.stream_url = f"{server_url}/upload_stream/{robot_id}" if robot_id else f"{server_url}/upload_stream"
         self.cap = None
-        self.qrDecoder = cv2.QRCodeDetector()
+        
+        profile = dict(CAMERA_PROFILES[camera_profile])
+        self.frame_size = profile.pop('frame_size')
+        decoder = create_decoder(profile.pop('strategy'), **profile)
+        self.scanner = QRScanner(roi_padding=ROI_PADDING, full_scan_interval=FULL_SCAN_INTERVAL,
+                                 use_tracker=USE_TRACKER, decoder=decoder)
+        self.change_detector = ChangeDetector(threshold=CHANGE_THRESHOLD,
+                                              refresh_interval=CHANGE_REFRESH_INTERVAL)
         
         self.last_detected = ""
         self.last_time = 0
         self.last_bbox = None
         self.last_verification = None
         self.verification_status = "idle"
+        self.state_lock = threading.RLock()
         
         self.frame_upload_thread = None
+        self.capture_thread = None
+        self.detection_thread = None
         self.running = False
-        self.current_frame = None
-        self.frame_lock = threading.Lock()
+        self.frame_ring = None
+        self.frame_slot = FrameSlot()
+        self.stream_frames_sent = 0
+        
+        self.capture_rate = RateCounter()
+        self.detect_rate = RateCounter()
+        self.display_rate = RateCounter()
+        self.dropped_frames = 0
+        
+        # Separate pools so a slow frame upload never holds up a verification
+        self.upload_session = create_http_session(pool_size, http_retries, http_backoff)
+        self.verify_session = create_http_session(pool_size, http_retries, http_backoff)
+        
+        self.verify_executor = ThreadPoolExecutor(max_workers=VERIFY_WORKERS, thread_name_prefix='verify')
+        self.event_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scan-event')
+        self.pending_verifications = {}
+        self.verification_cache = VerificationCache()
+        self.catalog_watch_thread = None
         
     def initialize_camera(self):
         self.cap = cv2.VideoCapture(self.camera_source)
         if not self.cap.isOpened():
             print("Error: Could not open video stream.")
             return False
+        # Keep the driver from queueing stale frames behind the one we want
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
         return True
     
-    def upload_frame_worker(self):
+    def create_frame_ring(self, frame):
+        if self.frame_size is not None:
+            shape = (self.frame_size[1], self.frame_size[0], 3)
+        else:
+            shape = frame.shape
+        self.frame_ring = FrameRing(FRAME_RING_SLOTS, shape)
+        self.frame_slot.ring = self.frame_ring
+    
+    def capture_worker(self):
+        capture_buffer = None
         while self.running:
-            with self.frame_lock:
-                if self.current_frame is not None:
-                    frame_to_upload = self.current_frame.copy()
-                else:
-                    time.sleep(0.05)
+            slot = self.frame_ring.acquire() if self.frame_ring is not None else None
+            if slot is not None and self.frame_size is None:
+                # Native resolution: let the driver decode straight into the slot
+                ret, frame = self.cap.read(self.frame_ring.view(slot))
+            else:
+                ret, capture_buffer = self.cap.read(capture_buffer)
+                frame = capture_buffer
+            
+            if not ret:
+                if slot is not None:
+                    self.frame_ring.release(slot)
+                print("Error: Failed to grab frame.")
+                self.running = False
+                break
+            
+            if self.frame_ring is None:
+                self.create_frame_ring(frame)
+                slot = self.frame_ring.acquire()
+            if slot is None:
+                # Every slot is still held by a reader; drop this frame
+                continue
+            
+            view = self.frame_ring.view(slot)
+            if not np.shares_memory(frame, view):
+                cv2.resize(frame, (view.shape[1], view.shape[0]), dst=view)
+            self.frame_slot.put(slot)
+            self.capture_rate.tick()
+    
+    def detection_worker(self):
+        last_seq = 0
+        while self.running:
+            slot, seq = self.frame_slot.get(last_seq)
+            if slot is None:
+                continue
+            if last_seq:
+                self.dropped_frames += seq - last_seq - 1
+            last_seq = seq
+            
+            try:
+                frame = self.frame_ring.view(slot)
+                if not self.change_detector.should_process(frame):
                     continue
+                data, bbox = self.scanner.detect(frame)
+            finally:
+                self.frame_ring.release(slot)
+            
+            self.detect_rate.tick()
+            self.process_detection(data, bbox)
+    
+    def process_detection(self, data, bbox):
+        current_time = time.time()
+        
+        with self.state_lock:
+            if data:
+                data = data.strip()
+                if data != self.last_detected:
+                    print(f"\n📦 QR Code Detected: {data}")
+                    
+                    self.last_verification = None
+                    self.verification_status = "pending"
+                    
+                    self.last_detected = data
+                    self.last_time = current_time
+                    self.last_bbox = bbox
+                    self.request_verification(data)
+                else:
+                    self.last_bbox = bbox
+            else:
+                if current_time - self.last_time > VERIFY_COOLDOWN:
+                    self.last_bbox = None
+                    self.last_detected = ""
+                    if self.last_verification or self.verification_status == "pending":
+                        self.last_verification = None
+                        self.verification_status = "idle"
+    
+    def stats(self):
+        stats = {
+            'capture_fps': round(self.capture_rate.rate, 1),
+            'detect_fps': round(self.detect_rate.rate, 1),
+            'display_fps': round(self.display_rate.rate, 1),
+            'frames_captured': self.capture_rate.count,
+            'frames_detected': self.detect_rate.count,
+            'frames_dropped': self.dropped_frames,
+            'ring_overruns': self.frame_ring.overruns if self.frame_ring is not None else 0
+        }
+        stats.update(self.scanner.stats())
+        stats.update(self.change_detector.stats())
+        return stats
+    
+    def upload_frame_worker(self):
+        last_seq = 0
+        while self.running:
+            slot, seq = self.frame_slot.get(last_seq)
+            if slot is None:
+                continue
+            last_seq = seq
             
             try:
-                _, buffer = cv2.imencode('.jpg', frame_to_upload, [cv2.IMWRITE_JPEG_QUALITY, 70])
+                try:
+                    _, buffer = cv2.imencode('.jpg', self.frame_ring.view(slot), [cv2.IMWRITE_JPEG_QUALITY, 70])
+                finally:
+                    self.frame_ring.release(slot)
                 files = {'frame': ('frame.jpg', BytesIO(buffer.tobytes()), 'image/jpeg')}
-                requests.post(f"{self.server_url}/upload_frame", files=files, timeout=1)
+                self.upload_session.post(self.upload_url, files=files, timeout=1)
             except Exception as e:
                 pass
             
             time.sleep(UPLOAD_INTERVAL)
     
+    def encoded_frames(self):
+        last_seq = 0
+        while self.running:
+            slot, seq = self.frame_slot.get(last_seq)
+            if slot is None:
+                continue
+            last_seq = seq
+            
+            try:
+                ok, buffer = cv2.imencode('.jpg', self.frame_ring.view(slot), [cv2.IMWRITE_JPEG_QUALITY, 70])
+            finally:
+                self.frame_ring.release(slot)
+            if not ok:
+                continue
+            
+            data = buffer.tobytes()
+            yield FRAME_HEADER.pack(len(data)) + data
+            self.stream_frames_sent += 1
+            time.sleep(STREAM_UPLOAD_INTERVAL)
+    
+    def stream_upload_worker(self):
+        backoff = 0.5
+        while self.running:
+            sent_before = self.stream_frames_sent
+            try:
+                self.upload_session.post(
+                    self.stream_url,
+                    data=self.encoded_frames(),
+                    headers={'Content-Type': 'application/octet-stream'},
+                    timeout=(3, None)
+                )
+            except Exception as e:
+                pass
+            
+            if not self.running:
+                break
+            
+            if self.stream_frames_sent > sent_before:
+                backoff = 0.5
+            else:
+                backoff = min(backoff * 2, STREAM_RECONNECT_MAX)
+            time.sleep(backoff)
+    
     def verify_qr_code(self, qr_data):
         try:
-            response = requests.post(
+            response = self.verify_session.post(
                 f"{self.server_url}/verify_qr",
                 json={'qr_data': qr_data},
                 timeout=3
             )
             
             if response.status_code == 200:
-                return response.json()
+                self.verification_cache.observe_version(response.headers.get('X-Catalog-Version'))
+                result = response.json()
+                if result.get('status') in CACHEABLE_STATUSES:
+                    self.verification_cache.put(qr_data, result)
+                return result
             else:
                 return {'status': 'error', 'message': 'Server error', 'is_correct': False}
         except Exception as e:
             print(f"❌ Verification failed: {e}")
             return {'status': 'error', 'message': str(e), 'is_correct': False}
     
+    def send_scan_event(self, qr_data):
+        try:
+            response = self.verify_session.post(
+                f"{self.server_url}/scan_event",
+                json={'qr_data': qr_data},
+                timeout=3
+            )
+            self.verification_cache.observe_version(response.headers.get('X-Catalog-Version'))
+        except Exception as e:
+            pass
+    
+    def catalog_watch_worker(self):
+        while self.running:
+            try:
+                response = self.verify_session.get(
+                    f"{self.server_url}/catalog/version",
+                    params={'since': self.verification_cache.catalog_version or '',
+                            'timeout': CATALOG_WATCH_TIMEOUT},
+                    timeout=CATALOG_WATCH_TIMEOUT + 5
+                )
+                if response.status_code == 200:
+                    self.verification_cache.observe_version(response.json()['version'])
+                    continue
+            except Exception as e:
+                pass
+            time.sleep(CATALOG_WATCH_TIMEOUT / 6)
+    
+    def request_verification(self, qr_data):
+        if qr_data in self.pending_verifications:
+            return self.pending_verifications[qr_data]
+        
+        cached = self.verification_cache.get(qr_data)
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            self.event_executor.submit(self.send_scan_event, qr_data)
+        else:
+            future = self.verify_executor.submit(self.verify_qr_code, qr_data)
+        
+        with self.state_lock:
+            self.pending_verifications[qr_data] = future
+        future.add_done_callback(lambda f: self.on_verification_done(qr_data, f))
+        return future
+    
+    def on_verification_done(self, qr_data, future):
+        with self.state_lock:
+            self.pending_verifications.pop(qr_data, None)
+            if future.cancelled():
+                return
+            
+            verification_result = future.result()
+            if verification_result and qr_data == self.last_detected:
+                print(f"🔍 {verification_result.get('message', 'Verified')}")
+                self.last_verification = verification_result
+                self.verification_status = verification_result.get('status', 'unknown')
+    
     def draw_verification_overlay(self, frame, verification_result):
         if not verification_result:
             return
@@ -109,105 +491,119 @@ class WarehouseRobot:
         cv2.putText(frame, message, (20, 100),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
     
+    def draw_frame(self, frame):
+        with self.state_lock:
+            last_bbox = self.last_bbox
+            last_detected = self.last_detected
+            last_verification = self.last_verification
+            verification_status = self.verification_status
+            pending = last_detected in self.pending_verifications
+        
+        if last_bbox is not None:
+            points = np.int32(last_bbox).reshape(-1, 2)
+            x, y, w, h = cv2.boundingRect(points)
+            
+            box_color = (0, 255, 0) if verification_status == 'correct' else (0, 0, 255)
+            cv2.rectangle(frame, (x, y), (x + w, y + h), box_color, 3)
+            
+            if last_detected:
+                cv2.putText(frame, last_detected, (x, y - 10),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, box_color, 2)
+        
+        if last_verification:
+            self.draw_verification_overlay(frame, last_verification)
+        elif pending:
+            cv2.putText(frame, f"Verifying {last_detected}...", (20, 40),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+        else:
+            cv2.putText(frame, "Scanning for QR codes...", (20, 40),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+        
+        cv2.putText(frame, f"Server: {self.server_url}", (20, frame.shape[0] - 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
+        cv2.putText(frame, f"Cap {self.capture_rate.rate:.0f} / Det {self.detect_rate.rate:.0f} FPS",
+                    (frame.shape[1] - 200, frame.shape[0] - 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
+    
     def run(self):
         if not self.initialize_camera():
             return
         
         print("🚀 Warehouse Robot QR Scanner started")
-        print(f"📡 Streaming to: {self.server_url}/video_feed")
+        feed_url = f"{self.server_url}/video_feed/{self.robot_id}" if self.robot_id else f"{self.server_url}/video_feed"
+        print(f"📡 Streaming to: {feed_url}")
         print("Press 'q' to quit, 'r' to reset verification")
         
         cv2.namedWindow("Warehouse Robot Scanner", cv2.WINDOW_NORMAL)
         cv2.resizeWindow("Warehouse Robot Scanner", 800, 600)
         
         self.running = True
-        self.frame_upload_thread = threading.Thread(target=self.upload_frame_worker, daemon=True)
+        upload_worker = self.stream_upload_worker if self.upload_mode == "stream" else self.upload_frame_worker
+        self.frame_upload_thread = threading.Thread(target=upload_worker, daemon=True)
         self.frame_upload_thread.start()
+        self.catalog_watch_thread = threading.Thread(target=self.catalog_watch_worker, daemon=True)
+        self.catalog_watch_thread.start()
         
-        while True:
-            ret, frame = self.cap.read()
-            if not ret:
-                print("Error: Failed to grab frame.")
-                break
-            
-            frame = cv2.resize(frame, (800, 600))
-            
-            with self.frame_lock:
-                self.current_frame = frame.copy()
-            
-            data, bbox, _ = self.qrDecoder.detectAndDecode(frame)
-            
-            current_time = time.time()
-            
-            if data:
-                data = data.strip()
-                if data != self.last_detected:
-                    print(f"\n📦 QR Code Detected: {data}")
-                    
-                    verification_result = self.verify_qr_code(data)
-                    
-                    if verification_result:
-                        print(f"🔍 {verification_result.get('message', 'Verified')}")
-                        self.last_verification = verification_result
-                        self.verification_status = verification_result.get('status', 'unknown')
-                    
-                    self.last_detected = data
-                    self.last_time = current_time
-                    self.last_bbox = bbox
-                else:
-                    self.last_bbox = bbox
-            else:
-                if current_time - self.last_time > VERIFY_COOLDOWN:
-                    self.last_bbox = None
-                    self.last_detected = ""
-                    if self.last_verification:
-                        self.last_verification = None
-                        self.verification_status = "idle"
-            
-            if self.last_bbox is not None:
-                points = np.int32(self.last_bbox).reshape(-1, 2)
-                x, y, w, h = cv2.boundingRect(points)
-                
-                box_color = (0, 255, 0) if self.verification_status == 'correct' else (0, 0, 255)
-                cv2.rectangle(frame, (x, y), (x + w, y + h), box_color, 3)
-                
-                if self.last_detected:
-                    cv2.putText(frame, self.last_detected, (x, y - 10),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, box_color, 2)
-            
-            if self.last_verification:
-                self.draw_verification_overlay(frame, self.last_verification)
-            else:
-                cv2.putText(frame, "Scanning for QR codes...", (20, 40),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-            
-            cv2.putText(frame, f"Server: {self.server_url}", (20, frame.shape[0] - 20),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
+        self.capture_thread = threading.Thread(target=self.capture_worker, daemon=True)
+        self.capture_thread.start()
+        self.detection_thread = threading.Thread(target=self.detection_worker, daemon=True)
+        self.detection_thread.start()
+        
+        last_seq = 0
+        last_stats = time.time()
+        display_frame = None
+        while self.running:
+            slot, seq = self.frame_slot.get(last_seq)
+            if slot is not None:
+                last_seq = seq
+                # Draw on a reused buffer so the slot goes back to the ring right away
+                frame = self.frame_ring.view(slot)
+                if display_frame is None or display_frame.shape != frame.shape:
+                    display_frame = np.empty_like(frame)
+                np.copyto(display_frame, frame)
+                self.frame_ring.release(slot)
+                frame = display_frame
+                self.draw_frame(frame)
+                cv2.imshow("Warehouse Robot Scanner", frame)
+                self.display_rate.tick()
             
-            cv2.imshow("Warehouse Robot Scanner", frame)
+            if time.time() - last_stats >= STATS_INTERVAL:
+                stats = self.stats()
+                print(f"📈 Capture {stats['capture_fps']} FPS | Detect {stats['detect_fps']} FPS | "
+                      f"Display {stats['display_fps']} FPS | Dropped {stats['frames_dropped']} | "
+                      f"ROI hit rate {stats['roi_hit_rate']:.0%} | Static skipped {stats['skip_rate']:.0%} | "
+                      f"Ring overruns {stats['ring_overruns']}")
+                last_stats = time.time()
             
             key = cv2.waitKey(1) & 0xFF
             if key == ord('q'):
                 break
             elif key == ord('r'):
-                self.last_verification = None
-                self.verification_status = "idle"
-                self.last_detected = ""
+                with self.state_lock:
+                    self.last_verification = None
+                    self.verification_status = "idle"
+                    self.last_detected = ""
+                self.change_detector.reset()
                 print("🔄 Verification reset")
         
         self.cleanup()
     
     def cleanup(self):
         self.running = False
-        if self.frame_upload_thread:
-            self.frame_upload_thread.join(timeout=2)
+        for thread in (self.capture_thread, self.detection_thread, self.frame_upload_thread):
+            if thread:
+                thread.join(timeout=2)
         if self.cap:
             self.cap.release()
+        self.verify_executor.shutdown(wait=False, cancel_futures=True)
+        self.event_executor.shutdown(wait=False, cancel_futures=True)
+        self.upload_session.close()
+        self.verify_session.close()
         cv2.destroyAllWindows()
         print("🛑 Warehouse Robot Scanner stopped.")
 
 def main():
-    robot = WarehouseRobot(camera_source=0, server_url=SERVER_URL)
+    robot = WarehouseRobot(camera_source=0, server_url=SERVER_URL, robot_id=ROBOT_ID)
     robot.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,53 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import select, tuple_
+from database import ScanLog, Product
+
+def encode_cursor(timestamp, log_id):
+    """Opaque token for the position after the row (timestamp, log_id)"""
+    raw = json.dumps([timestamp.isoformat(), log_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(token):
+    """Inverse of encode_cursor; raises ValueError for anything malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        timestamp, log_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), int(log_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+
+def fetch_scan_history(session, limit, cursor=None):
+    """One page of scan logs, newest first, keyed on (timestamp, id).
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    Product names come from the same query, so a page is one round trip
+    however large it is.
+    """
+    query = (
+        select(ScanLog.id, ScanLog.qr_data, ScanLog.status, ScanLog.is_correct_location,
+               ScanLog.message, ScanLog.timestamp, Product.name)
+        .outerjoin(Product, ScanLog.product_id == Product.id)
+        .order_by(ScanLog.timestamp.desc(), ScanLog.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        timestamp, log_id = decode_cursor(cursor)
+        query = query.where(tuple_(ScanLog.timestamp, ScanLog.id) < tuple_(timestamp, log_id))
+
+    rows = session.execute(query).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+
+    return [{
+        'id': row.id,
+        'qr_data': row.qr_data,
+        'status': row.status,
+        'is_correct': row.is_correct_location,
+        'message': row.message,
+        'timestamp': row.timestamp.isoformat(),
+        'product': row.name
+    } for row in rows], next_cursor
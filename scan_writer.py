@@ -0,0 +1,56 @@
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.exc import InterfaceError, OperationalError
+from database import get_session, ScanLog
+from config import Config
+from write_behind import WriteBehindBuffer
+
+LOG_COLUMNS = ('product_id', 'qr_data', 'scanned_location_id', 'is_correct_location', 'status', 'message')
+
+class ScanLogWriter:
+    """Write-behind buffer that persists ScanLog rows in multi-row inserts"""
+
+    # Lost connection, restart/failover or a cancelled statement: retry the batch until the database is back
+    transient_errors = (OperationalError, InterfaceError)
+
+    def __init__(self, max_queue=Config.SCAN_LOG_QUEUE_SIZE,
+                 batch_size=Config.SCAN_LOG_BATCH_SIZE,
+                 flush_interval=Config.SCAN_LOG_FLUSH_INTERVAL,
+                 enqueue_timeout=Config.SCAN_LOG_ENQUEUE_TIMEOUT):
+        self.buffer = WriteBehindBuffer(self, 'scan-log-writer', batch_size, flush_interval,
+                                        max_queue, enqueue_timeout)
+
+    def start(self):
+        self.buffer.start()
+
+    def submit(self, log_fields):
+        return self.submit_many([log_fields])
+
+    def submit_many(self, rows):
+        """Queue rows for insertion; rows submitted together land in one transaction"""
+        now = datetime.utcnow()
+        batch = []
+        for row in rows:
+            record = {column: row.get(column) for column in LOG_COLUMNS}
+            record['timestamp'] = row.get('timestamp') or now
+            batch.append(record)
+        return self.buffer.put(batch)
+
+    def write(self, rows):
+        session = get_session()
+        try:
+            session.execute(insert(ScanLog), rows)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def stop(self, timeout=10):
+        self.buffer.stop(timeout)
+
+    def stats(self):
+        return self.buffer.stats()
+
+scan_writer = ScanLogWriter()
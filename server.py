@@ -1,73 +1,78 @@
-from flask import Flask, Response, request, jsonify
+from flask import Flask, Response, request, jsonify, url_for
 from flask_cors import CORS
-import cv2
-import numpy as np
-from database import get_session, Product, Category, Location, ScanLog
+from werkzeug.wsgi import get_input_stream
+from database import get_session
 from config import Config
-import threading
+from catalog_cache import catalog
+from verification import verify_qr_data
+from scan_writer import scan_writer
+from scan_history import fetch_scan_history
+from product_listing import parse_fields, products_etag, list_products
+from partitions import partition_maintenance
+from video_stream import StreamRegistry, DEFAULT_ROBOT_ID, generate_frames, read_frame_stream
 import time
 
 app = Flask(__name__)
 app.config.from_object(Config)
-CORS(app)
+CORS(app, expose_headers=['X-Catalog-Version', 'X-Next-Cursor', 'Link', 'X-Total-Count', 'ETag'])
 
-class VideoStreamManager:
-    def __init__(self):
-        self.frame = None
-        self.lock = threading.Lock()
-        self.clients = 0
-        
-    def update_frame(self, frame):
-        with self.lock:
-            self.frame = frame.copy()
-    
-    def get_frame(self):
-        with self.lock:
-            if self.frame is None:
-                return None
-            return self.frame.copy()
-
-video_manager = VideoStreamManager()
+stream_registry = StreamRegistry(
+    idle_timeout=Config.STREAM_IDLE_TIMEOUT,
+    sweep_interval=Config.STREAM_SWEEP_INTERVAL
+)
 
-def generate_frames():
-    while True:
-        frame = video_manager.get_frame()
-        if frame is None:
-            time.sleep(0.1)
-            continue
-        
-        ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-        if not ret:
-            continue
-        
-        frame_bytes = buffer.tobytes()
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+@app.after_request
+def add_catalog_version(response):
+    if catalog.loaded:
+        response.headers['X-Catalog-Version'] = catalog.snapshot.tag
+    return response
 
 @app.route('/video_feed')
-def video_feed():
-    return Response(generate_frames(),
+@app.route('/video_feed/<robot_id>')
+def video_feed(robot_id=DEFAULT_ROBOT_ID):
+    return Response(generate_frames(stream_registry, robot_id),
                     mimetype='multipart/x-mixed-replace; boundary=frame')
 
+@app.route('/streams', methods=['GET'])
+def list_streams():
+    return jsonify(stream_registry.stats()), 200
+
 @app.route('/upload_frame', methods=['POST'])
-def upload_frame():
+@app.route('/upload_frame/<robot_id>', methods=['POST'])
+def upload_frame(robot_id=DEFAULT_ROBOT_ID):
     try:
         file = request.files.get('frame')
         if not file:
             return jsonify({'error': 'No frame provided'}), 400
         
-        npimg = np.frombuffer(file.read(), np.uint8)
-        frame = cv2.imdecode(npimg, cv2.IMREAD_COLOR)
-        
-        if frame is None:
+        if not stream_registry.publish(robot_id, file.read(), Config.VIDEO_PASSTHROUGH):
             return jsonify({'error': 'Invalid frame'}), 400
         
-        video_manager.update_frame(frame)
         return jsonify({'status': 'success'}), 200
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/upload_stream', methods=['POST'])
+@app.route('/upload_stream/<robot_id>', methods=['POST'])
+def upload_stream(robot_id=DEFAULT_ROBOT_ID):
+    frames = 0
+    rejected = 0
+    try:
+        stream = get_input_stream(request.environ)
+        for data in read_frame_stream(stream, Config.MAX_CONTENT_LENGTH):
+            if stream_registry.publish(robot_id, data, Config.VIDEO_PASSTHROUGH):
+                frames += 1
+            else:
+                rejected += 1
+        
+        return jsonify({'status': 'success', 'frames': frames, 'rejected': rejected}), 200
+    
+    except ValueError as e:
+        return jsonify({'error': str(e), 'frames': frames, 'rejected': rejected}), 400
+    except Exception as e:
+        return jsonify({'error': str(e), 'frames': frames, 'rejected': rejected}), 500
+
 @app.route('/verify_qr', methods=['POST'])
 def verify_qr():
     try:
@@ -77,165 +82,135 @@ def verify_qr():
         if not qr_data:
             return jsonify({'error': 'No QR data provided'}), 400
         
-        session = get_session()
+        response, log_fields = verify_qr_data(qr_data)
         
-        try:
-            parts = qr_data.split('/')
-            if len(parts) < 3:
-                log = ScanLog(
-                    qr_data=qr_data,
-                    scanned_location_id=None,  # Don't set invalid location ID
-                    is_correct_location=False,
-                    status='invalid',
-                    message='Invalid QR format. Expected: category/product/location'
-                )
-                session.add(log)
-                session.commit()
-                
-                return jsonify({
-                    'status': 'invalid',
-                    'message': 'Invalid QR format',
-                    'is_correct': False
-                }), 200
-            
-            category_id = int(parts[0])
-            product_id = int(parts[1])
-            scanned_location_id = int(parts[2])
-            
-            product = session.query(Product).filter_by(qr_code=qr_data, is_active=True).first()
-            
-            if not product:
-                product = session.query(Product).filter_by(id=product_id, is_active=True).first()
-            
-            if not product:
-                # Check if the scanned location exists before logging
-                scanned_location = session.query(Location).get(scanned_location_id)
-                
-                log = ScanLog(
-                    qr_data=qr_data,
-                    scanned_location_id=scanned_location_id if scanned_location else None,
-                    is_correct_location=False,
-                    status='not_found',
-                    message='Product not found in database'
-                )
-                session.add(log)
-                session.commit()
-                
-                return jsonify({
-                    'status': 'not_found',
-                    'message': 'Product not found in database',
-                    'is_correct': False,
-                    'qr_data': qr_data
-                }), 200
-            
-            is_correct = (
-                product.category_id == category_id and 
-                product.location_id == scanned_location_id
-            )
-            
-            category = session.query(Category).get(category_id)
-            expected_location = session.query(Location).get(product.location_id)
-            scanned_location = session.query(Location).get(scanned_location_id)
-            
-            if is_correct:
-                message = f"✅ CORRECT: {product.name} is at the right location"
-                status = 'correct'
-            else:
-                expected_loc_str = expected_location.full_location if expected_location else "Unknown"
-                scanned_loc_str = scanned_location.full_location if scanned_location else "Unknown"
-                message = f"❌ MISPLACED: {product.name} should be at {expected_loc_str}, but found at {scanned_loc_str}"
-                status = 'misplaced'
-            
-            log = ScanLog(
-                product_id=product.id,
-                qr_data=qr_data,
-                scanned_location_id=scanned_location_id,
-                is_correct_location=is_correct,
-                status=status,
-                message=message
-            )
-            session.add(log)
-            session.commit()
-            
-            response = {
-                'status': status,
-                'is_correct': is_correct,
-                'message': message,
-                'product': {
-                    'id': product.id,
-                    'name': product.name,
-                    'sku': product.sku,
-                    'quantity': product.quantity,
-                    'price': product.price
-                },
-                'category': {
-                    'id': category.id,
-                    'name': category.name
-                } if category else None,
-                'expected_location': {
-                    'id': expected_location.id,
-                    'description': expected_location.full_location
-                } if expected_location else None,
-                'scanned_location': {
-                    'id': scanned_location.id,
-                    'description': scanned_location.full_location
-                } if scanned_location else None
-            }
-            
-            return jsonify(response), 200
+        if log_fields:
+            scan_writer.submit(log_fields)
+        
+        return jsonify(response), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/verify_qr/batch', methods=['POST'])
+def verify_qr_batch():
+    try:
+        data = request.json
+        qr_codes = data.get('qr_codes', []) if isinstance(data, dict) else []
+        
+        if not isinstance(qr_codes, list) or not qr_codes:
+            return jsonify({'error': 'No QR codes provided'}), 400
+        
+        if len(qr_codes) > Config.VERIFY_BATCH_MAX:
+            return jsonify({'error': f'Too many QR codes (max {Config.VERIFY_BATCH_MAX})'}), 400
+        
+        results = []
+        logs = []
+        for qr_data in qr_codes:
+            qr_data = str(qr_data or '').strip()
+            if not qr_data:
+                results.append({'error': 'No QR data provided'})
+                continue
             
-        finally:
-            session.close()
+            response, log_fields = verify_qr_data(qr_data)
+            results.append(response)
+            if log_fields:
+                logs.append(log_fields)
+        
+        scan_writer.submit_many(logs)
+        
+        return jsonify({'results': results}), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/scan_event', methods=['POST'])
+def scan_event():
+    try:
+        data = request.json
+        qr_data = data.get('qr_data', '').strip()
+        
+        if not qr_data:
+            return jsonify({'error': 'No QR data provided'}), 400
+        
+        _, log_fields = verify_qr_data(qr_data)
+        if log_fields:
+            scan_writer.submit(log_fields)
+        
+        return jsonify({'status': 'accepted'}), 202
     
-    except ValueError as e:
-        return jsonify({
-            'status': 'invalid',
-            'message': f'Invalid QR data format: {str(e)}',
-            'is_correct': False
-        }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/catalog/version', methods=['GET'])
+def catalog_version():
+    since = request.args.get('since')
+    timeout = min(request.args.get('timeout', 0, type=float), Config.CATALOG_WATCH_MAX_TIMEOUT)
+    
+    if not since or timeout <= 0:
+        catalog.refresh()
+        return jsonify({'version': catalog.snapshot.tag}), 200
+    
+    return jsonify({'version': catalog.wait_for_change(since, timeout)}), 200
+
+@app.route('/catalog/invalidate', methods=['POST'])
+def invalidate_catalog():
+    try:
+        catalog.invalidate()
+        return jsonify({'status': 'success', 'catalog': catalog.stats()}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/catalog/stats', methods=['GET'])
+def catalog_stats():
+    return jsonify(catalog.stats()), 200
+
+@app.route('/scan_writer/stats', methods=['GET'])
+def scan_writer_stats():
+    return jsonify(scan_writer.stats()), 200
+
 @app.route('/products', methods=['GET'])
 def get_products():
-    session = get_session()
     try:
-        products = session.query(Product).filter_by(is_active=True).all()
-        result = []
-        for p in products:
-            result.append({
-                'id': p.id,
-                'name': p.name,
-                'sku': p.sku,
-                'qr_code': p.qr_code,
-                'quantity': p.quantity,
-                'price': p.price,
-                'category': p.category.name if p.category else None,
-                'location': p.location.full_location if p.location else None
-            })
-        return jsonify(result), 200
-    finally:
-        session.close()
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    limit = request.args.get('limit', type=int)
+    if limit is not None:
+        limit = min(max(limit, 1), Config.PRODUCTS_MAX_LIMIT)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    
+    try:
+        snapshot = catalog.get_snapshot()
+        etag = products_etag(snapshot, fields, limit, offset)
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = jsonify(list_products(snapshot, fields, limit, offset))
+        response.set_etag(etag)
+        response.headers['X-Total-Count'] = str(len(snapshot.products))
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
 @app.route('/scan_history', methods=['GET'])
 def get_scan_history():
     session = get_session()
     try:
-        limit = request.args.get('limit', 50, type=int)
-        logs = session.query(ScanLog).order_by(ScanLog.timestamp.desc()).limit(limit).all()
-        
-        result = []
-        for log in logs:
-            result.append({
-                'id': log.id,
-                'qr_data': log.qr_data,
-                'status': log.status,
-                'is_correct': log.is_correct_location,
-                'message': log.message,
-                'timestamp': log.timestamp.isoformat(),
-                'product': log.product.name if log.product else None
-            })
-        return jsonify(result), 200
+        limit = min(max(request.args.get('limit', 50, type=int), 1), Config.SCAN_HISTORY_MAX_LIMIT)
+        cursor = request.args.get('cursor')
+        try:
+            result, next_cursor = fetch_scan_history(session, limit, cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # The body stays a plain array; the cursor for the next page travels in headers
+        response = jsonify(result)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+            next_url = url_for('get_scan_history', limit=limit, cursor=next_cursor)
+            response.headers['Link'] = f'<{next_url}>; rel="next"'
+        return response, 200
     finally:
         session.close()
 
@@ -247,4 +222,5 @@ def health_check():
     }), 200
 
 if __name__ == '__main__':
+    partition_maintenance.start()
     app.run(host=Config.HOST, port=Config.PORT, debug=False, threaded=True)
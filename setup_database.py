@@ -2,6 +2,7 @@ import sys
 import os
 from database import init_db
 from seed_data import seed_database
+from migrate import migrate
 
 # Set environment variable for UTF-8 encoding on Windows
 if sys.platform == 'win32':
@@ -25,7 +26,10 @@ def setup():
         safe_print("\n1. Creating database tables...")
         init_db()
         
-        safe_print("\n2. Seeding database with dummy data...")
+        safe_print("\n2. Applying schema migrations...")
+        migrate()
+        
+        safe_print("\n3. Seeding database with dummy data...")
         seed_database()
         
         safe_print("\n" + "=" * 50)
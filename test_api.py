@@ -33,6 +33,12 @@ class APITester:
             if data:
                 print(f"\nSample Product:")
                 print(json.dumps(data[0], indent=2))
+            
+            etag = response.headers.get('ETag')
+            if etag:
+                cached = requests.get(f"{self.base_url}/products", headers={'If-None-Match': etag}, timeout=5)
+                print(f"Conditional Request: {cached.status_code} (expected 304)")
+                return response.status_code == 200 and cached.status_code == 304
             return response.status_code == 200
         except Exception as e:
             print(f"❌ Error: {e}")
@@ -55,6 +61,25 @@ class APITester:
             print(f"❌ Error: {e}")
             return False
     
+    def test_batch_verification(self, qr_codes):
+        print("\n" + "="*60)
+        print(f"Testing Batch QR Verification: {len(qr_codes)} codes")
+        print("="*60)
+        try:
+            response = requests.post(
+                f"{self.base_url}/verify_qr/batch",
+                json={'qr_codes': qr_codes},
+                timeout=5
+            )
+            print(f"Status: {response.status_code}")
+            results = response.json().get('results', [])
+            for qr, result in zip(qr_codes, results):
+                print(f"  {qr}: {result.get('status')} - {result.get('message')}")
+            return response.status_code == 200 and len(results) == len(qr_codes)
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            return False
+    
     def test_scan_history(self, limit=10):
         print("\n" + "="*60)
         print(f"Testing Scan History (limit={limit})")
@@ -67,6 +92,14 @@ class APITester:
             if data:
                 print(f"\nMost Recent Scan:")
                 print(json.dumps(data[0], indent=2))
+            
+            next_cursor = response.headers.get('X-Next-Cursor')
+            if next_cursor:
+                page = requests.get(f"{self.base_url}/scan_history",
+                                    params={'limit': limit, 'cursor': next_cursor}, timeout=5).json()
+                overlap = {log['id'] for log in data} & {log['id'] for log in page}
+                print(f"Next Page: {len(page)} scans, {len(overlap)} overlapping")
+                return response.status_code == 200 and not overlap
             return response.status_code == 200
         except Exception as e:
             print(f"❌ Error: {e}")
@@ -104,6 +137,9 @@ class APITester:
             results.append((f"QR: {qr}", self.test_qr_verification(qr)))
             time.sleep(0.3)
         
+        time.sleep(0.5)
+        results.append(("Batch Verify", self.test_batch_verification([qr for qr, _ in test_qr_codes])))
+        
         time.sleep(0.5)
         results.append(("Scan History", self.test_scan_history(5)))
         
@@ -141,13 +177,18 @@ def main():
             tester.test_products()
         elif command == "history":
             tester.test_scan_history()
+        elif command == "batch":
+            if len(sys.argv) > 2:
+                tester.test_batch_verification(sys.argv[2:])
+            else:
+                print("Usage: python test_api.py batch <qr_code> [<qr_code> ...]")
         elif command == "verify":
             if len(sys.argv) > 2:
                 tester.test_qr_verification(sys.argv[2])
             else:
                 print("Usage: python test_api.py verify <qr_code>")
         else:
-            print("Unknown command. Use: health, products, history, or verify <qr_code>")
+            print("Unknown command. Use: health, products, history, verify <qr_code>, or batch <qr_code>...")
     else:
         tester.run_all_tests()
 
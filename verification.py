@@ -0,0 +1,106 @@
+from catalog_cache import catalog
+
+def verify_qr_data(qr_data, cache=catalog):
+    """Resolve a QR string against the catalog cache.
+
+    Returns (response, log) where log holds the ScanLog fields to record,
+    or None when nothing should be logged.
+    """
+    parts = qr_data.split('/')
+    if len(parts) < 3:
+        log = {
+            'qr_data': qr_data,
+            'scanned_location_id': None,  # Don't set invalid location ID
+            'is_correct_location': False,
+            'status': 'invalid',
+            'message': 'Invalid QR format. Expected: category/product/location'
+        }
+        return {
+            'status': 'invalid',
+            'message': 'Invalid QR format',
+            'is_correct': False
+        }, log
+
+    try:
+        category_id = int(parts[0])
+        product_id = int(parts[1])
+        scanned_location_id = int(parts[2])
+    except ValueError as e:
+        return {
+            'status': 'invalid',
+            'message': f'Invalid QR data format: {str(e)}',
+            'is_correct': False
+        }, None
+
+    product = cache.get_product(qr_data, product_id)
+
+    if not product:
+        # Check if the scanned location exists before logging
+        scanned_location = cache.get_location(scanned_location_id)
+
+        log = {
+            'qr_data': qr_data,
+            'scanned_location_id': scanned_location_id if scanned_location else None,
+            'is_correct_location': False,
+            'status': 'not_found',
+            'message': 'Product not found in database'
+        }
+        return {
+            'status': 'not_found',
+            'message': 'Product not found in database',
+            'is_correct': False,
+            'qr_data': qr_data
+        }, log
+
+    is_correct = (
+        product.category_id == category_id and
+        product.location_id == scanned_location_id
+    )
+
+    category = cache.get_category(category_id)
+    expected_location = cache.get_location(product.location_id)
+    scanned_location = cache.get_location(scanned_location_id)
+
+    if is_correct:
+        message = f"✅ CORRECT: {product.name} is at the right location"
+        status = 'correct'
+    else:
+        expected_loc_str = expected_location.full_location if expected_location else "Unknown"
+        scanned_loc_str = scanned_location.full_location if scanned_location else "Unknown"
+        message = f"❌ MISPLACED: {product.name} should be at {expected_loc_str}, but found at {scanned_loc_str}"
+        status = 'misplaced'
+
+    log = {
+        'product_id': product.id,
+        'qr_data': qr_data,
+        'scanned_location_id': scanned_location_id if scanned_location else None,
+        'is_correct_location': is_correct,
+        'status': status,
+        'message': message
+    }
+
+    response = {
+        'status': status,
+        'is_correct': is_correct,
+        'message': message,
+        'product': {
+            'id': product.id,
+            'name': product.name,
+            'sku': product.sku,
+            'quantity': product.quantity,
+            'price': product.price
+        },
+        'category': {
+            'id': category.id,
+            'name': category.name
+        } if category else None,
+        'expected_location': {
+            'id': expected_location.id,
+            'description': expected_location.full_location
+        } if expected_location else None,
+        'scanned_location': {
+            'id': scanned_location.id,
+            'description': scanned_location.full_location
+        } if scanned_location else None
+    }
+    return response, log
@@ -0,0 +1,220 @@
+import struct
+import threading
+import time
+import cv2
+import numpy as np
+
+JPEG_QUALITY = 85
+JPEG_SOI = b'\xff\xd8'
+DEFAULT_ROBOT_ID = 'default'
+FRAME_HEADER = struct.Struct('>I')
+
+def is_jpeg(data):
+    return len(data) > 4 and data[:2] == JPEG_SOI
+
+def read_exact(stream, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    pos = 0
+    while pos < size:
+        n = stream.readinto(view[pos:])
+        if not n:
+            return None
+        pos += n
+    return buffer
+
+def read_frame_stream(stream, max_frame_size):
+    """Yield frames from a body of 4-byte big-endian length prefixes followed by JPEG bytes"""
+    while True:
+        header = read_exact(stream, FRAME_HEADER.size)
+        if header is None:
+            return
+        (size,) = FRAME_HEADER.unpack(header)
+        if size == 0:
+            continue
+        if size > max_frame_size:
+            raise ValueError(f'Frame of {size} bytes exceeds limit of {max_frame_size}')
+        data = read_exact(stream, size)
+        if data is None:
+            return
+        yield data
+
+class VideoStreamManager:
+    def __init__(self, jpeg_quality=JPEG_QUALITY):
+        self.jpeg_quality = jpeg_quality
+        self.frame = None
+        self.frame_version = 0
+        self.jpeg = None
+        self.version = 0
+        self.lock = threading.Lock()
+        self.new_frame = threading.Condition(self.lock)
+        self.clients = 0
+        self.encodes = 0
+        self.passthrough = 0
+        self.decodes = 0
+        self.closed = False
+        self.last_update = time.time()
+
+    def update_frame(self, frame):
+        ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ret:
+            return False
+
+        with self.new_frame:
+            self.jpeg = buffer.tobytes()
+            self.version += 1
+            self.frame = frame
+            self.frame_version = self.version
+            self.encodes += 1
+            self.last_update = time.time()
+            self.new_frame.notify_all()
+        return True
+
+    def update_jpeg(self, jpeg_bytes):
+        """Publish an already-encoded JPEG as-is; pixels are decoded only on demand"""
+        with self.new_frame:
+            self.jpeg = jpeg_bytes
+            self.version += 1
+            self.passthrough += 1
+            self.last_update = time.time()
+            self.new_frame.notify_all()
+
+    def get_frame(self):
+        with self.lock:
+            if self.jpeg is None:
+                return None
+            if self.frame_version == self.version:
+                return self.frame.copy()
+            jpeg, version = self.jpeg, self.version
+
+        frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            return None
+
+        with self.lock:
+            self.decodes += 1
+            if self.frame_version < version:
+                self.frame = frame
+                self.frame_version = version
+        return frame.copy()
+
+    def wait_for_jpeg(self, last_version, timeout=1.0):
+        """Block until a frame newer than last_version is available"""
+        with self.new_frame:
+            self.new_frame.wait_for(lambda: self.closed or self.version != last_version, timeout=timeout)
+            if self.closed or self.jpeg is None or self.version == last_version:
+                return None, last_version
+            return self.jpeg, self.version
+
+    def close(self):
+        with self.new_frame:
+            self.closed = True
+            self.new_frame.notify_all()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'version': self.version,
+                'encodes': self.encodes,
+                'passthrough': self.passthrough,
+                'decodes': self.decodes,
+                'clients': self.clients,
+                'idle_seconds': round(time.time() - self.last_update, 1)
+            }
+
+class StreamRegistry:
+    """Per-robot stream managers; the registry lock only guards the dict"""
+
+    def __init__(self, idle_timeout=60.0, sweep_interval=10.0, jpeg_quality=JPEG_QUALITY):
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self.jpeg_quality = jpeg_quality
+        self.streams = {}
+        self.lock = threading.Lock()
+        self.last_sweep = time.time()
+        self.evictions = 0
+
+    def get(self, robot_id):
+        self._maybe_evict()
+        return self.streams.get(robot_id)
+
+    def get_or_create(self, robot_id):
+        self._maybe_evict()
+        manager = self.streams.get(robot_id)
+        if manager is not None:
+            return manager
+        with self.lock:
+            manager = self.streams.get(robot_id)
+            if manager is None:
+                manager = VideoStreamManager(self.jpeg_quality)
+                self.streams[robot_id] = manager
+            return manager
+
+    def publish(self, robot_id, data, passthrough=True):
+        if passthrough:
+            if not is_jpeg(data):
+                return False
+            self.get_or_create(robot_id).update_jpeg(data)
+            return True
+
+        frame = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            return False
+        return self.get_or_create(robot_id).update_frame(frame)
+
+    def _maybe_evict(self):
+        now = time.time()
+        if now - self.last_sweep < self.sweep_interval:
+            return
+        evicted = []
+        with self.lock:
+            if now - self.last_sweep < self.sweep_interval:
+                return
+            self.last_sweep = now
+            for robot_id, manager in list(self.streams.items()):
+                if now - manager.last_update > self.idle_timeout:
+                    del self.streams[robot_id]
+                    evicted.append(manager)
+            self.evictions += len(evicted)
+        for manager in evicted:
+            manager.close()
+
+    def stats(self):
+        self._maybe_evict()
+        with self.lock:
+            streams = dict(self.streams)
+            evictions = self.evictions
+        return {
+            'evictions': evictions,
+            'streams': {robot_id: manager.stats() for robot_id, manager in streams.items()}
+        }
+
+def generate_frames(registry, robot_id=DEFAULT_ROBOT_ID):
+    manager = None
+    version = 0
+    try:
+        while True:
+            if manager is not None and manager.closed:
+                with manager.lock:
+                    manager.clients -= 1
+                manager = None
+
+            if manager is None:
+                manager = registry.get(robot_id)
+                if manager is None:
+                    time.sleep(0.1)
+                    continue
+                version = 0
+                with manager.lock:
+                    manager.clients += 1
+
+            frame_bytes, version = manager.wait_for_jpeg(version)
+            if frame_bytes is None:
+                continue
+
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+    finally:
+        if manager is not None:
+            with manager.lock:
+                manager.clients -= 1
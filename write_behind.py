@@ -0,0 +1,191 @@
+import atexit
+import queue
+import threading
+import time
+
+class WriteBehindBuffer:
+    """Queues rows and hands them to a sink in batches from one background thread.
+
+    The sink provides write(rows), which raises on failure, and optionally
+    connect() and disconnect(), which run on the writer thread. A batch is
+    written every batch_size rows or flush_interval seconds, whichever comes
+    first. A rejected batch is split in halves and retried so only the bad
+    rows are lost. Exception types listed in sink.transient_errors (lost
+    connection, failover) keep the whole batch and retry it with backoff,
+    as does a failing connect(); meanwhile new rows wait in the bounded
+    queue. Rows still unwritten when stop() interrupts a retry count as failed.
+    """
+
+    def __init__(self, sink, name, batch_size, flush_interval, max_queue,
+                 enqueue_timeout=0, max_retry_delay=30.0):
+        self.sink = sink
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.max_retry_delay = max_retry_delay
+        self.transient_errors = getattr(sink, 'transient_errors', ())
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.stopping = False
+        atexit.register(self.stop)
+
+        self.pending_rows = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+        self.last_error = None
+
+    def start(self):
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.stopping = False
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self.thread.start()
+
+    def put(self, rows):
+        """Queue rows to be written together; False (and counted as dropped) if the queue stays full"""
+        if not rows:
+            return True
+        self.start()
+        with self.lock:
+            self.pending_rows += len(rows)
+        try:
+            self.queue.put(rows, timeout=self.enqueue_timeout)
+        except queue.Full:
+            with self.lock:
+                self.pending_rows -= len(rows)
+                self.dropped += len(rows)
+            return False
+        return True
+
+    def _connect(self):
+        """Call sink.connect() until it succeeds; False if stop() came first"""
+        connect = getattr(self.sink, 'connect', None)
+        delay = 0.5
+        while connect is not None:
+            try:
+                connect()
+                return True
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"❌ {self.name} could not connect, retrying in {delay:.1f}s: {e}")
+                if self.stop_event.wait(delay):
+                    return False
+                delay = min(delay * 2, self.max_retry_delay)
+        return True
+
+    def _run(self):
+        if not self._connect():
+            rows = self._drain()
+            with self.lock:
+                self.pending_rows -= len(rows)
+                self.failed += len(rows)
+            print(f"❌ {self.name} stopped without connecting; {len(rows)} row(s) not written")
+            return
+        try:
+            while True:
+                rows = []
+                deadline = time.time() + self.flush_interval
+                while len(rows) < self.batch_size:
+                    timeout = deadline - time.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch = self.queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    if batch is None:
+                        self._flush(rows + self._drain())
+                        return
+                    rows.extend(batch)
+                self._flush(rows)
+        finally:
+            disconnect = getattr(self.sink, 'disconnect', None)
+            if disconnect is not None:
+                disconnect()
+
+    def _drain(self):
+        rows = []
+        while True:
+            try:
+                batch = self.queue.get_nowait()
+            except queue.Empty:
+                return rows
+            if batch is not None:
+                rows.extend(batch)
+
+    def _write(self, rows):
+        """Write rows and return how many made it, halving around rejected rows"""
+        delay = 0.5
+        while True:
+            try:
+                self.sink.write(rows)
+                return len(rows)
+            except self.transient_errors as e:
+                self.last_error = str(e)
+                if self.stop_event.is_set():
+                    print(f"❌ {self.name} stopped before {len(rows)} row(s) could be written: {e}")
+                    return 0
+                print(f"⚠️ {self.name} could not write {len(rows)} row(s), retrying in {delay:.1f}s: {e}")
+                self.stop_event.wait(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+            except Exception as e:
+                self.last_error = str(e)
+                if len(rows) == 1:
+                    print(f"❌ {self.name} failed to write {len(rows)} row(s): {e}")
+                    return 0
+                break
+        middle = len(rows) // 2
+        return self._write(rows[:middle]) + self._write(rows[middle:])
+
+    def _flush(self, rows):
+        if not rows:
+            return
+        start = time.perf_counter()
+        written = self._write(rows)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with self.lock:
+            self.pending_rows -= len(rows)
+            self.written += written
+            self.failed += len(rows) - written
+            self.flushes += 1
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self.total_flush_ms += elapsed_ms
+
+    def stop(self, timeout=10):
+        """Write everything queued so far and stop the writer thread"""
+        with self.lock:
+            thread = self.thread
+            if thread is None or self.stopping:
+                return
+            self.stopping = True
+        self.stop_event.set()
+        self.queue.put(None)
+        thread.join(timeout=timeout)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'queue_depth': self.queue.qsize(),
+                'pending_rows': self.pending_rows,
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'flushes': self.flushes,
+                'last_flush_ms': round(self.last_flush_ms, 2),
+                'max_flush_ms': round(self.max_flush_ms, 2),
+                'avg_flush_ms': round(self.total_flush_ms / self.flushes, 2) if self.flushes else 0.0,
+                'last_error': self.last_error,
+                'running': self.thread is not None and self.thread.is_alive()
+            }